@@ -1,9 +1,34 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
 from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import json
 import os
+import random
+import queue
+import threading
+import time
+
+# orjson is optional - several times faster than the stdlib json encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Numba is optional - compiles the bird classification rules to native code
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as plain Python"""
+        def decorator(func):
+            return func
+        return decorator
 
 # TensorFlow Lite imports (much lighter for Raspberry Pi)
 try:
@@ -22,15 +47,167 @@ except ImportError:
         print("pip3 install tflite-runtime")
         TFLITE_AVAILABLE = False
 
+# Smaller crops are resized on the CPU - the GPU upload/download costs more
+OPENCL_MIN_PIXELS = 256 * 256
+
+# Frames per YOLO call for models that accept a batch (see _yolo_accepts_batches)
+DEFAULT_YOLO_BATCH = 8
+
+# draw_detections box colours (BGR)
+CLASS_COLORS = {
+    'person': (0, 255, 0),    # Green
+    'dog': (255, 0, 0),       # Blue
+    'bird': (0, 0, 255)       # Red
+}
+DEFAULT_COLOR = (128, 128, 128)
+FELIX_COLOR = (255, 0, 255)   # Magenta
+LEIA_COLOR = (0, 255, 255)    # Cyan
+
+# Label text height is the same for every label at this font and scale
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_HEIGHT = cv2.getTextSize("Ag", LABEL_FONT, 0.5, 2)[0][1]
+
+# Bird size thresholds (bounding box area in pixels)
+LARGE_BIRD_AREA = 40000
+MEDIUM_BIRD_AREA = 15000
+
+# bird_species_rules keys, indexed by _classify_bird_category
+BIRD_CATEGORIES = (
+    'large_dark', 'large_brown', 'large_other',
+    'medium_red', 'medium_blue', 'medium_brown', 'medium_other',
+    'small_any'
+)
+
+@njit(cache=True)
+def _classify_bird_category(bbox_area, dominant_hue, avg_saturation, avg_brightness):
+    """Map bird size and colour stats to an index into BIRD_CATEGORIES"""
+    # Color classification
+    dark = avg_brightness < 80
+    red = not dark and (dominant_hue < 15 or dominant_hue > 165)
+    blue = not dark and not red and 90 < dominant_hue < 130
+    
+    # Classify based on size and color ('brown' and 'other' colours are
+    # treated the same everywhere)
+    if bbox_area > LARGE_BIRD_AREA:
+        if dark:
+            return 0
+        elif red or blue:
+            return 2
+        return 1
+    elif bbox_area > MEDIUM_BIRD_AREA:
+        if red:
+            return 3
+        elif blue:
+            return 4
+        elif dark:
+            return 6
+        return 5
+    return 7
+
+def _classifier_input_conversion(input_detail):
+    """
+    How _fill_classifier_input fills a TFLite classifier's input
+    
+    Returns:
+        tuple: (is_float, lut) - lut is None when raw uint8 pixels can be
+               copied as they are, else a 256-entry table mapping each
+               pixel value to the quantized input value. None for inputs
+               _fill_classifier_input can't produce
+    """
+    dtype = np.dtype(input_detail['dtype'])
+    if dtype == np.float32:
+        return True, None
+    if dtype not in (np.uint8, np.int8):
+        return None
+    
+    scale, zero_point = input_detail['quantization']
+    if dtype == np.uint8 and zero_point == 0 and (scale == 0 or abs(scale * 255.0 - 1.0) < 1e-3):
+        # Quantized [0, 1] input (or no quantization) - raw pixels as-is
+        return False, None
+    if scale == 0:
+        return None  # Integer input with no quantization parameters
+    
+    # pixel / 255 quantized with the model's (scale, zero_point)
+    limits = np.iinfo(dtype)
+    quantized = np.rint(np.arange(256) / 255.0 / scale + zero_point)
+    return False, np.clip(quantized, limits.min, limits.max).astype(dtype)
+
+def _fill_classifier_input(input_buffer, rgb_image, conversion):
+    """Write uint8 RGB pixels into a classifier input as its model expects them"""
+    is_float, lut = conversion
+    if is_float:
+        # Normalize to [0, 1] for float32 models (cast + scale in one pass)
+        np.multiply(rgb_image, np.float32(1.0 / 255.0), out=input_buffer)
+    elif lut is None:
+        # uint8 [0, 1]-quantized models take raw pixels - no normalization pass
+        np.copyto(input_buffer, rgb_image)
+    else:
+        # Other quantizations (e.g. int8 input) - one table lookup per pixel
+        np.take(lut, rgb_image, out=input_buffer, mode='clip')
+
+def _yolo_accepts_batches(model_file):
+    """
+    Whether a YOLO model runs several frames in one call - PyTorch weights
+    and ONNX exports with a dynamic batch axis do, while NCNN and OpenVINO
+    exports (and static ONNX) are fixed at one frame
+    """
+    if model_file.endswith('.pt'):
+        return True
+    if model_file.endswith('.onnx'):
+        try:
+            # Ultralytics runs ONNX exports through onnxruntime, so it's
+            # installed whenever an .onnx model can be used at all
+            import onnxruntime
+            session = onnxruntime.InferenceSession(model_file, providers=['CPUExecutionProvider'])
+            # A dynamic axis has a symbolic name (or None) instead of a size
+            return not isinstance(session.get_inputs()[0].shape[0], int)
+        except Exception as e:
+            print(f"⚠️  Could not read the ONNX batch axis, assuming batch size 1: {e}")
+    return False
+
 class SimpleAIDetector:
-    def __init__(self, models_dir='models'):
-        """Initialize AI detector with YOLO + TensorFlow Lite dog classifier"""
+    def __init__(self, models_dir='models', batch_size=None):
+        """
+        Initialize AI detector with YOLO + TensorFlow Lite dog classifier
+        
+        Args:
+            models_dir: Directory holding the TFLite models
+            batch_size: Frames per YOLO call (default DEFAULT_YOLO_BATCH) - only
+                        used when the loaded YOLO model accepts batches, static
+                        NCNN/OpenVINO exports always run one frame per call
+        """
         self.yolo_model = None
         self.dog_classifier = None
+        self.bird_classifier = None
         self.models_dir = models_dir
         
+        # TFLite threads - XNNPACK spreads conv kernels across all Pi cores
+        self.num_threads = os.cpu_count() or 4
+        # The dog classifier's own count - DetectionPipeline lowers it to the
+        # cores it reserves for classification (set_dog_classifier_threads)
+        self.dog_num_threads = self.num_threads
+        self.dog_model_path = None
+        # Runs dog classifier invokes for classify_dogs_pipelined
+        self._invoke_pool = None
+        
+        # YOLO models in order of preference: INT8-quantized OpenVINO export,
+        # FP16 OpenVINO export, ARM-optimized NCNN export, ONNX Runtime
+        # export, then the original PyTorch weights
+        self.yolo_model_files = [
+            'yolov8n_int8_openvino_model',
+            'yolov8n_openvino_model',
+            'yolov8n_ncnn_model',
+            'yolov8n.onnx',
+            'yolov8n.pt'
+        ]
+        
+        # YOLO input size - cost grows with the square of it, 320 is
+        # roughly twice as fast as the default 640 on the Pi
+        self.yolo_imgsz = 320
+        
         # Load custom dog class names
         self.dog_classes = self.load_dog_classes()
+        self._class_display = [class_name.capitalize() for class_name in self.dog_classes]
         
         # YOLO target classes (for initial detection)
         self.target_classes = {
@@ -39,17 +216,60 @@ class SimpleAIDetector:
             'bird': 14
         }
         
-        # Enhanced bird species classification
+        # Offload big crop resizes to the GPU through OpenCV's OpenCL (T-API)
+        # backend when the OpenCV build has a usable OpenCL device
+        self.use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        
+        # Dogs below these are reported as 'Unknown Dog' without running
+        # the TFLite classifier
+        self.dog_min_confidence = 0.55
+        self.dog_min_area = 5000
+        
+        # Filter YOLO boxes on the integer class id - non-target classes
+        # never need a name lookup
+        self._target_ids = frozenset(self.target_classes.values())
+        self._id_to_name = {class_id: name for name, class_id in self.target_classes.items()}
+        self._target_id_array = np.array(sorted(self._target_ids))
+        
+        # Shared YOLO call arguments - classes= makes Ultralytics decode and
+        # NMS only our target classes instead of all 80 COCO classes
+        self._yolo_args = {
+            'conf': 0.3,
+            'imgsz': self.yolo_imgsz,
+            'classes': sorted(self._target_ids),
+            'verbose': False
+        }
+        
+        # Optional quantized bird species classifier (falls back to the
+        # rule-based guess below when the model isn't installed)
+        self.bird_model_file = 'bird_classifier.tflite'
+        self.bird_labels_file = 'bird_labels.txt'
+        self.bird_labels = []
+        
+        # Enhanced bird species classification (tuples for random.choice)
         self.bird_species_rules = {
-            'large_dark': ['Crow', 'Raven', 'Blackbird'],
-            'large_brown': ['Hawk', 'Eagle', 'Owl'],
-            'medium_red': ['Cardinal', 'Robin'],
-            'medium_blue': ['Blue Jay', 'Bluebird'],
-            'medium_brown': ['Sparrow', 'Finch'],
-            'small_any': ['Wren', 'Chickadee', 'Nuthatch'],
-            'unknown': ['Unknown Bird']
+            'large_dark': ('Crow', 'Raven', 'Blackbird'),
+            'large_brown': ('Hawk', 'Eagle', 'Owl'),
+            'medium_red': ('Cardinal', 'Robin'),
+            'medium_blue': ('Blue Jay', 'Bluebird'),
+            'medium_brown': ('Sparrow', 'Finch'),
+            'small_any': ('Wren', 'Chickadee', 'Nuthatch'),
+            'large_other': ('Large Bird',),
+            'medium_other': ('Medium Bird',),
+            'unknown': ('Unknown Bird',)
         }
         
+        # Frames waiting for a batched YOLO call (see collect/flush). The
+        # real batch size depends on the model - set in initialize_models
+        self.requested_batch_size = batch_size
+        self.yolo_batchable = False
+        self.batch_size = 1
+        self._frame_buffer = deque()
+        
+        # Single background writer for detection JPEGs/JSON - keeps saves in
+        # order and off the detection path
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        
     def load_dog_classes(self):
         """Load custom dog class names from JSON file"""
         class_names_file = os.path.join(self.models_dir, 'class_names.json')
@@ -72,9 +292,29 @@ class SimpleAIDetector:
         
         # 1. Initialize YOLO for general object detection
         try:
-            print("Loading YOLO8 model for general object detection...")
-            self.yolo_model = YOLO('yolov8n.pt')
+            # Imported here - ultralytics pulls in torch, which is slow and
+            # memory-hungry to import on the Pi
+            from ultralytics import YOLO
+            
+            yolo_file = self.select_yolo_model()
+            print(f"Loading YOLO8 model for general object detection: {yolo_file}")
+            # Ultralytics dispatches NCNN/ONNX exports to their own backends,
+            # so detect_objects keeps calling self.yolo_model(image, ...)
+            self.yolo_model = YOLO(yolo_file, task='detect')
             print("✅ YOLO8 model loaded successfully")
+            
+            # Static exports only take one frame - a bigger batch would be
+            # cut to its first frame (NCNN) or fail outright (OpenVINO)
+            self.yolo_batchable = _yolo_accepts_batches(yolo_file)
+            if self.yolo_batchable:
+                self.batch_size = self.requested_batch_size or DEFAULT_YOLO_BATCH
+            elif self.requested_batch_size and self.requested_batch_size > 1:
+                print(f"⚠️  {yolo_file} has a fixed batch size - running one frame per YOLO call")
+            print(f"   YOLO batch size: {self.batch_size}")
+            if yolo_file.endswith('.pt'):
+                print("⚠️  Using PyTorch YOLO weights - for faster inference run:")
+                print("   python3 ai_detector_simple.py export ncnn")
+            self.warm_up_yolo()
         except Exception as e:
             print(f"❌ Failed to initialize YOLO8: {e}")
             success = False
@@ -89,12 +329,72 @@ class SimpleAIDetector:
             print("⚠️  TensorFlow Lite not available - using generic dog detection")
             print("To install: pip3 install tflite-runtime")
         
+        # 3. Optional TensorFlow Lite bird species classifier
+        if TFLITE_AVAILABLE and self.load_tflite_bird_classifier():
+            print("✅ Using TensorFlow Lite bird species classification")
+        
         return success
     
+    def warm_up_yolo(self, runs=2):
+        """
+        Run YOLO on blank frames so the first motion event doesn't pay for
+        predictor setup, backend initialization and kernel/allocator warm-up
+        """
+        blank = np.zeros((self.yolo_imgsz, self.yolo_imgsz, 3), dtype=np.uint8)
+        start = time.time()
+        for _ in range(runs):
+            self.yolo_model(blank, **self._yolo_args)
+        print(f"✅ YOLO warmed up ({time.time() - start:.1f}s)")
+    
+    def select_yolo_model(self):
+        """Return the fastest YOLO model available on disk"""
+        for model_file in self.yolo_model_files:
+            if os.path.exists(model_file):
+                return model_file
+        
+        # Nothing exported yet - Ultralytics downloads the PyTorch weights
+        return self.yolo_model_files[-1]
+    
+    def export_yolo_model(self, model_format='ncnn', int8=False, half=False):
+        """
+        Export the PyTorch YOLO weights to NCNN, ONNX or OpenVINO (one-off)
+        
+        Args:
+            model_format: 'ncnn' (NEON-optimized, best on Raspberry Pi), 'onnx'
+                          or 'openvino'
+            int8: Quantize to INT8, calibrating on coco128 (Ultralytics only
+                  supports this for some formats, e.g. OpenVINO)
+            half: Store FP16 weights (NCNN/OpenVINO) - half the weight memory
+                  traffic of FP32
+            
+        Returns:
+            bool: True if the export succeeded
+        """
+        try:
+            from ultralytics import YOLO
+            
+            precision = ' INT8' if int8 else ' FP16' if half else ''
+            print(f"Exporting yolov8n.pt to {model_format.upper()}{precision}...")
+            # ONNX needs a dynamic batch axis for detect_objects_batch
+            export_args = {'dynamic': True} if model_format == 'onnx' else {}
+            if int8:
+                export_args.update(int8=True, data='coco128.yaml')
+            elif half:
+                export_args['half'] = True
+            # Exports have a fixed input size, so bake in the one we infer at
+            exported = YOLO('yolov8n.pt').export(format=model_format, imgsz=self.yolo_imgsz,
+                                                 **export_args)
+            print(f"✅ YOLO model exported: {exported}")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to export YOLO model: {e}")
+            return False
+    
     def load_tflite_dog_classifier(self):
         """Load the TensorFlow Lite dog classification model"""
         # Try TFLite files in order of preference
         tflite_files = [
+            'dog_classifier_int8.tflite',  # from quantize_dog_classifier.py
             'dog_classifier_compatible.tflite',
             'dog_classifier.tflite'
         ]
@@ -108,24 +408,18 @@ class SimpleAIDetector:
                 
             try:
                 print(f"Loading TensorFlow Lite dog classifier: {model_file}")
-                
-                # Initialize TFLite interpreter
-                self.dog_classifier = tflite.Interpreter(model_path=model_path)
-                self.dog_classifier.allocate_tensors()
-                
-                # Get input and output details
-                self.input_details = self.dog_classifier.get_input_details()
-                self.output_details = self.dog_classifier.get_output_details()
+                if not self._setup_dog_classifier(model_path):
+                    continue
                 
                 # Print model info
-                input_shape = self.input_details[0]['shape']
                 print(f"✅ TFLite dog classifier loaded successfully!")
                 print(f"   Model: {model_file}")
-                print(f"   Input shape: {input_shape}")
+                print(f"   Input shape: {self.input_details[0]['shape']}")
+                print(f"   Threads: {self.dog_num_threads}")
                 print(f"   Classes: {self.dog_classes}")
                 
                 return True
-                    
+                
             except Exception as e:
                 print(f"❌ Failed to load {model_file}: {e}")
                 continue
@@ -140,12 +434,151 @@ class SimpleAIDetector:
         
         return False
     
-    def classify_dog(self, dog_image):
+    def _setup_dog_classifier(self, model_path):
+        """
+        Create the dog classifier interpreter and its per-call constants
+        
+        Returns:
+            bool: False (with nothing replaced) if the model's input type
+                  isn't supported
+        """
+        # Initialize TFLite interpreter
+        dog_classifier = self._create_tflite_interpreter(model_path, self.dog_num_threads)
+        dog_classifier.allocate_tensors()
+        
+        # Get input and output details
+        input_details = dog_classifier.get_input_details()
+        output_details = dog_classifier.get_output_details()
+        input_conversion = _classifier_input_conversion(input_details[0])
+        if input_conversion is None:
+            quantization = input_details[0]['quantization']
+            print(f"⚠️  Skipping {os.path.basename(model_path)}: unsupported input "
+                  f"{np.dtype(input_details[0]['dtype']).name} (quantization {quantization})")
+            return False
+        
+        # Per-call constants, looked up once instead of on every dog
+        input_shape = input_details[0]['shape']
+        if len(input_shape) == 4:
+            # NHWC format: [batch, height, width, channels]
+            _, height, width, _ = input_shape
+        else:
+            # Default to common size if shape is unclear
+            height, width = 224, 224
+        in_idx = input_details[0]['index']
+        
+        # Double-buffered inputs for classify_dogs_pipelined
+        staging_buffers = [np.zeros(input_shape, dtype=input_details[0]['dtype'])
+                           for _ in range(2)]
+        
+        # Everything above is built in locals - a failure leaves the current
+        # interpreter (if any) fully usable. Swap the new one in from here on
+        self.input_details = input_details
+        self.output_details = output_details
+        # Zero-copy accessors for the interpreter's own input/output
+        # buffers (call them to get a numpy view, never keep the view)
+        self._in_idx = in_idx
+        self._input_tensor = dog_classifier.tensor(in_idx)
+        self._output_tensor = dog_classifier.tensor(output_details[0]['index'])
+        self._input_size = (int(width), int(height))
+        self._input_conversion = input_conversion
+        self._output_quantization = output_details[0]['quantization']
+        self._staging_buffers = staging_buffers
+        
+        # A fresh invoke thread per interpreter - the old one is let go
+        if self._invoke_pool is not None:
+            self._invoke_pool.shutdown(wait=False)
+        self._invoke_pool = ThreadPoolExecutor(max_workers=1)
+        
+        self.dog_classifier = dog_classifier
+        self.dog_model_path = model_path
+        return True
+    
+    def set_dog_classifier_threads(self, num_threads):
+        """
+        Rebuild the dog classifier interpreter with num_threads TFLite threads
+        
+        Args:
+            num_threads: Threads for the interpreter - with 1, XNNPACK makes no
+                         thread pool and invoke() runs on the calling thread
+        """
+        if self.dog_classifier is None or num_threads == self.dog_num_threads:
+            return
+        
+        previous_threads = self.dog_num_threads
+        self.dog_num_threads = num_threads
+        try:
+            self._setup_dog_classifier(self.dog_model_path)
+            print(f"✅ TFLite dog classifier now uses {num_threads} thread(s)")
+        except Exception as e:
+            # Creating the new interpreter failed - keep using the old one
+            self.dog_num_threads = previous_threads
+            print(f"⚠️  Could not rebuild dog classifier with {num_threads} thread(s): {e}")
+    
+    def load_tflite_bird_classifier(self):
+        """Load the optional INT8 TensorFlow Lite bird species classifier"""
+        model_path = os.path.join(self.models_dir, self.bird_model_file)
+        labels_path = os.path.join(self.models_dir, self.bird_labels_file)
+        
+        if not os.path.exists(model_path) or not os.path.exists(labels_path):
+            print(f"⚠️  Bird classifier not found ({model_path}) - using rule-based bird classification")
+            return False
+        
+        try:
+            with open(labels_path, 'r') as f:
+                self.bird_labels = [line.strip() for line in f if line.strip()]
+            
+            bird_classifier = self._create_tflite_interpreter(model_path)
+            bird_classifier.allocate_tensors()
+            
+            input_details = bird_classifier.get_input_details()[0]
+            output_details = bird_classifier.get_output_details()[0]
+            input_conversion = _classifier_input_conversion(input_details)
+            if input_conversion is None:
+                print(f"⚠️  Skipping {self.bird_model_file}: unsupported input "
+                      f"{np.dtype(input_details['dtype']).name} (quantization {input_details['quantization']})"
+                      f" - using rule-based bird classification")
+                return False
+            
+            self._bird_input_conversion = input_conversion
+            self._bird_input_tensor = bird_classifier.tensor(input_details['index'])
+            self._bird_output_tensor = bird_classifier.tensor(output_details['index'])
+            _, height, width, _ = input_details['shape']
+            self._bird_input_size = (int(width), int(height))
+            self.bird_classifier = bird_classifier
+            
+            print(f"✅ TFLite bird classifier loaded: {self.bird_model_file} "
+                  f"({len(self.bird_labels)} species)")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Failed to load bird classifier: {e}")
+            self.bird_classifier = None
+            return False
+    
+    def _create_tflite_interpreter(self, model_path, num_threads=None):
+        """Create a multi-threaded TFLite interpreter (num_threads defaults to every core)"""
+        # Keep passing model_path rather than model_content: TFLite mmaps the
+        # file itself, so the weights are reclaimable page-cache pages shared
+        # across restarts instead of a private heap copy
+        try:
+            # Recent TFLite builds apply the XNNPACK delegate by default,
+            # num_threads lets it use every core instead of just one. It is
+            # the only thread knob TFLite reads - XNNPACK ignores environment
+            # variables, and OMP_NUM_THREADS would only throttle torch/YOLO
+            return tflite.Interpreter(model_path=model_path,
+                                      num_threads=num_threads or self.num_threads)
+        except TypeError:
+            # Older TFLite builds don't accept num_threads
+            return tflite.Interpreter(model_path=model_path)
+    
+    def classify_dog(self, dog_image, bgr=False, return_all=False):
         """
         Classify a detected dog using TensorFlow Lite
         
         Args:
             dog_image: Cropped image of the detected dog (RGB format)
+            bgr: True if dog_image is in OpenCV BGR order
+            return_all: Also fill 'all_predictions' with every class score
             
         Returns:
             dict: Classification results with confidence scores
@@ -158,35 +591,14 @@ class SimpleAIDetector:
             }
         
         try:
-            # Preprocess the image for TFLite model
-            processed_image = self.preprocess_dog_image(dog_image)
+            # Preprocess the image straight into the TFLite input tensor
+            self.preprocess_dog_image(dog_image, bgr=bgr)
             
-            # Run TFLite inference
-            self.dog_classifier.set_tensor(self.input_details[0]['index'], processed_image)
+            # Run TFLite inference and read the output without copying
             self.dog_classifier.invoke()
-            predictions = self.dog_classifier.get_tensor(self.output_details[0]['index'])[0]
-            
-            # Get the predicted class
-            predicted_class_idx = np.argmax(predictions)
-            confidence = float(predictions[predicted_class_idx])
+            predictions = self._output_tensor()[0]
             
-            # Get class name
-            if predicted_class_idx < len(self.dog_classes):
-                predicted_class = self.dog_classes[predicted_class_idx].capitalize()
-            else:
-                predicted_class = f"Dog_Class_{predicted_class_idx}"
-            
-            # Create all predictions dict
-            all_predictions = {}
-            for i, class_name in enumerate(self.dog_classes):
-                if i < len(predictions):
-                    all_predictions[class_name.capitalize()] = float(predictions[i])
-            
-            return {
-                'predicted_class': predicted_class,
-                'confidence': confidence,
-                'all_predictions': all_predictions
-            }
+            return self._build_dog_classification(predictions, return_all)
             
         except Exception as e:
             print(f"❌ Error in TFLite dog classification: {e}")
@@ -196,130 +608,183 @@ class SimpleAIDetector:
                 'all_predictions': {}
             }
     
-    def preprocess_dog_image(self, image):
+    def _build_dog_classification(self, predictions, return_all=False):
+        """Turn raw TFLite dog classifier output into a classification dict"""
+        # Dequantize integer outputs back to probabilities
+        if predictions.dtype != np.float32:
+            scale, zero_point = self._output_quantization
+            predictions = (predictions.astype(np.float32) - zero_point) * scale
+        
+        # Get the predicted class
+        predicted_class_idx = int(predictions.argmax())
+        confidence = float(predictions[predicted_class_idx])
+        
+        # Get class name
+        if predicted_class_idx < len(self._class_display):
+            predicted_class = self._class_display[predicted_class_idx]
+        else:
+            predicted_class = f"Dog_Class_{predicted_class_idx}"
+        
+        # Per-class scores only when asked for - callers normally need top-1
+        all_predictions = {}
+        if return_all:
+            for class_name, score in zip(self._class_display, predictions.tolist()):
+                all_predictions[class_name] = score
+        
+        return {
+            'predicted_class': predicted_class,
+            'confidence': confidence,
+            'all_predictions': all_predictions
+        }
+    
+    def classify_dogs_pipelined(self, dog_images, bgr=False, return_all=False):
         """
-        Preprocess dog image for TensorFlow Lite model
+        Classify several dog crops, preprocessing the next crop while the
+        TFLite interpreter runs on the current one
+        
+        Args:
+            dog_images: List of cropped dog images
+            bgr: True if the crops are in OpenCV BGR order
+            return_all: Also fill 'all_predictions' with every class score
+            
+        Returns:
+            list: One classification dict per crop, in the same order
         """
+        if self.dog_classifier is None or len(dog_images) < 2:
+            return [self.classify_dog(dog_image, bgr=bgr, return_all=return_all)
+                    for dog_image in dog_images]
+        
+        classifications = []
         try:
-            # Get input shape from the model
-            input_shape = self.input_details[0]['shape']
+            # Ping-pong between two input buffers: invoke() releases the GIL,
+            # so the next crop is resized while the current one is classified
+            self.preprocess_dog_image(dog_images[0], bgr=bgr, out=self._staging_buffers[0])
+            for i in range(len(dog_images)):
+                future = self._invoke_pool.submit(self._invoke_dog_classifier,
+                                                  self._staging_buffers[i % 2])
+                if i + 1 < len(dog_images):
+                    self.preprocess_dog_image(dog_images[i + 1], bgr=bgr,
+                                              out=self._staging_buffers[(i + 1) % 2])
+                predictions = future.result()
+                classifications.append(self._build_dog_classification(predictions, return_all))
             
-            # Extract height and width (assuming NHWC format: [batch, height, width, channels])
-            if len(input_shape) == 4:
-                _, height, width, channels = input_shape
-            else:
-                # Default to common size if shape is unclear
-                height, width, channels = 224, 224, 3
+            return classifications
             
-            target_size = (width, height)
+        except Exception as e:
+            print(f"❌ Error in TFLite dog classification: {e}")
+            return classifications + [{
+                'predicted_class': 'Classification Error',
+                'confidence': 0.0,
+                'all_predictions': {}
+            } for _ in dog_images[len(classifications):]]
+    
+    def _invoke_dog_classifier(self, input_batch):
+        """Run the dog classifier on a preprocessed batch (on the invoke thread)"""
+        self.dog_classifier.set_tensor(self._in_idx, input_batch)
+        self.dog_classifier.invoke()
+        # Copy out - the output view is only valid until the next invoke
+        return self._output_tensor()[0].copy()
+    
+    def preprocess_dog_image(self, image, bgr=False, out=None):
+        """
+        Preprocess dog image into the TensorFlow Lite input tensor (in place)
+        
+        Args:
+            image: Cropped dog image (RGB, or BGR if bgr=True)
+            bgr: Swap channels after resizing, so callers can pass raw OpenCV crops
+            out: Write into this (1, H, W, C) array instead of the input tensor
+        """
+        try:
+            # Resize first so colour conversion and normalization only
+            # touch the small model-sized image
+            resized = self._resize(image, self._input_size, cv2.INTER_LINEAR)
             
             # Ensure image is RGB
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                # Already RGB
-                rgb_image = image
-            elif len(image.shape) == 2:
+            if len(resized.shape) == 2:
                 # Grayscale to RGB
-                rgb_image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+                rgb_image = cv2.cvtColor(resized, cv2.COLOR_GRAY2RGB)
             else:
-                # Handle other cases
-                rgb_image = image[:, :, :3] if image.shape[2] > 3 else image
+                # Drop any alpha channel
+                rgb_image = resized[:, :, :3] if resized.shape[2] > 3 else resized
+                if bgr:
+                    # Channel-reversed view - the swap happens during the
+                    # copy into the input buffer below, not as an extra pass
+                    rgb_image = rgb_image[:, :, ::-1]
             
-            # Resize to model's expected input size
-            resized = cv2.resize(rgb_image, target_size)
+            # Write straight into the interpreter's input tensor (batch of 1).
+            # The view is dropped on return, before classify_dog calls invoke()
+            input_buffer = self._input_tensor()[0] if out is None else out[0]
             
-            # Check if model expects float32 or uint8
-            input_dtype = self.input_details[0]['dtype']
-            
-            if input_dtype == np.float32:
-                # Normalize to [0, 1] for float32 models
-                normalized = resized.astype(np.float32) / 255.0
-            else:
-                # Keep as uint8 for quantized models
-                normalized = resized.astype(np.uint8)
-            
-            # Add batch dimension
-            batched = np.expand_dims(normalized, axis=0)
-            
-            return batched
+            _fill_classifier_input(input_buffer, rgb_image, self._input_conversion)
             
         except Exception as e:
             print(f"❌ Error preprocessing dog image: {e}")
-            # Return a safe default
+            # Feed a blank image rather than the previous dog
             try:
-                input_shape = self.input_details[0]['shape']
-                default_image = np.zeros(input_shape, dtype=self.input_details[0]['dtype'])
-                return default_image
-            except:
-                # Final fallback
-                return np.zeros((1, 224, 224, 3), dtype=np.float32)
+                (self._input_tensor() if out is None else out).fill(0)
+            except Exception:
+                pass
+    
+    def _resize(self, image, size, interpolation):
+        """cv2.resize, run through OpenCL for crops big enough to beat the upload cost"""
+        if self.use_opencl and image.shape[0] * image.shape[1] >= OPENCL_MIN_PIXELS:
+            return cv2.resize(cv2.UMat(image), size, interpolation=interpolation).get()
+        return cv2.resize(image, size, interpolation=interpolation)
+    
+    def _classify_bird_species(self, bird_image):
+        """Run the TFLite bird classifier on a BGR bird crop"""
+        resized = self._resize(bird_image, self._bird_input_size, cv2.INTER_LINEAR)
+        
+        # Swap channels during the copy into the input tensor
+        _fill_classifier_input(self._bird_input_tensor()[0], resized[:, :, 2::-1],
+                               self._bird_input_conversion)
+        self.bird_classifier.invoke()
+        
+        label_idx = int(self._bird_output_tensor()[0].argmax())
+        if label_idx < len(self.bird_labels):
+            return self.bird_labels[label_idx]
+        return "Unknown Bird"
     
     def _analyze_bird_features(self, bird_image, bbox_area):
-        """Bird species classification (unchanged from original)"""
+        """Bird species classification - TFLite model if loaded, else rules"""
         try:
             if bird_image.size == 0:
                 return "Unknown"
             
+            if self.bird_classifier is not None:
+                return self._classify_bird_species(bird_image)
+            
             height, width = bird_image.shape[:2]
             
-            # Size classification
-            if bbox_area > 40000:
-                size_category = 'large'
-            elif bbox_area > 15000:
-                size_category = 'medium'
-            else:
-                size_category = 'small'
+            # Small birds are classified on size alone - skip colour analysis
+            if bbox_area <= MEDIUM_BIRD_AREA:
+                return random.choice(self.bird_species_rules['small_any'])
+            
+            # The colour buckets are coarse, so a 64x64 thumbnail gives the
+            # same answer as the full-resolution crop for far less work
+            if height * width > 64 * 64:
+                bird_image = self._resize(bird_image, (64, 64), cv2.INTER_AREA)
             
             # Color analysis
             hsv = cv2.cvtColor(bird_image, cv2.COLOR_BGR2HSV)
-            h_hist = cv2.calcHist([hsv], [0], None, [180], [0, 180])
-            s_hist = cv2.calcHist([hsv], [1], None, [256], [0, 256])
-            v_hist = cv2.calcHist([hsv], [2], None, [256], [0, 256])
-            
-            dominant_hue = np.argmax(h_hist)
-            avg_saturation = np.average(np.arange(256), weights=s_hist.flatten())
-            avg_brightness = np.average(np.arange(256), weights=v_hist.flatten())
-            
-            # Color classification
-            if avg_brightness < 80:
-                color_category = 'dark'
-            elif dominant_hue < 15 or dominant_hue > 165:
-                color_category = 'red'
-            elif 90 < dominant_hue < 130:
-                color_category = 'blue'
-            elif avg_saturation < 100:
-                color_category = 'brown'
-            else:
-                color_category = 'other'
+            
+            # A histogram-weighted mean is just the channel mean, so only
+            # the hue mode needs a histogram; S and V come from one pass
+            flat = hsv.reshape(-1, 3)
+            dominant_hue = np.bincount(flat[:, 0], minlength=180).argmax()
+            _, avg_saturation, avg_brightness = flat.mean(axis=0)
             
             # Classify based on size and color
-            if size_category == 'large':
-                if color_category == 'dark':
-                    return np.random.choice(self.bird_species_rules['large_dark'])
-                elif color_category in ['brown', 'other']:
-                    return np.random.choice(self.bird_species_rules['large_brown'])
-                else:
-                    return "Large Bird"
-            elif size_category == 'medium':
-                if color_category == 'red':
-                    return np.random.choice(self.bird_species_rules['medium_red'])
-                elif color_category == 'blue':
-                    return np.random.choice(self.bird_species_rules['medium_blue'])
-                elif color_category in ['brown', 'other']:
-                    return np.random.choice(self.bird_species_rules['medium_brown'])
-                else:
-                    return "Medium Bird"
-            else:
-                return np.random.choice(self.bird_species_rules['small_any'])
+            category = _classify_bird_category(bbox_area, dominant_hue, avg_saturation, avg_brightness)
+            return random.choice(self.bird_species_rules[BIRD_CATEGORIES[category]])
                 
         except Exception as e:
             print(f"Error in bird analysis: {e}")
             return "Unknown"
     
-    def detect_objects(self, image):
-        """
-        Detect objects using YOLO, then classify dogs with TensorFlow Lite
-        """
-        results = {
+    def _new_results(self):
+        """Create an empty detection results dict"""
+        return {
             'timestamp': datetime.now().isoformat(),
             'detections': [],
             'has_person': False,
@@ -331,89 +796,206 @@ class SimpleAIDetector:
             'detected_dogs': [],
             'dog_classifications': []
         }
+    
+    def _process_yolo_result(self, image, result, results, dog_jobs):
+        """
+        Turn one YOLO Results object into detections for its source image
+        
+        Dog crops are appended to dog_jobs as (detection, crop) pairs so the
+        TFLite classification can run separately (see classify_dogs)
+        """
+        boxes = result.boxes
+        if boxes is None:
+            return
+        
+        # Pull every box across in one go - rows of x1, y1, x2, y2, conf, cls
+        box_data = boxes.data.cpu().numpy()
+        class_ids = box_data[:, -1].astype(np.int32)
+        
+        # Keep only our target classes
+        keep = np.isin(class_ids, self._target_id_array)
+        box_data = box_data[keep]
+        class_ids = class_ids[keep]
+        
+        xyxy = box_data[:, :4]
+        confidences = box_data[:, -2]
+        areas = (xyxy[:, 2] - xyxy[:, 0]) * (xyxy[:, 3] - xyxy[:, 1])
+        # Truncate every box to pixel coordinates at once (same as int())
+        bboxes = xyxy.astype(np.int32).tolist()
+        
+        for bbox, confidence, class_id, bbox_area in zip(
+                bboxes, confidences.tolist(), class_ids.tolist(), areas.tolist()):
+            class_name = self._id_to_name[class_id]
+            x1, y1, x2, y2 = bbox
+            
+            detection = {
+                'class': class_name,
+                'confidence': confidence,
+                'bbox': bbox,
+                'area': bbox_area
+            }
+            
+            # Special handling for dogs - run custom classification
+            if class_name == 'dog':
+                results['has_dog'] = True
+                
+                # Extract dog region and classify - weak or tiny boxes aren't
+                # worth a TFLite run
+                dog_region = None
+                if (confidence >= self.dog_min_confidence and
+                        bbox_area >= self.dog_min_area):
+                    dog_region = image[y1:y2, x1:x2]
+                
+                if dog_region is not None and dog_region.size > 0:
+                    # Classified after all boxes are parsed (see classify_dogs)
+                    dog_jobs.append((detection, dog_region))
+                else:
+                    # Fallback if dog region extraction fails or is skipped
+                    detection['dog_name'] = 'Unknown Dog'
+                    detection['dog_confidence'] = 0.0
+                    results['detected_dogs'].append('Unknown Dog')
+            
+            elif class_name == 'person':
+                results['has_person'] = True
+            
+            elif class_name == 'bird':
+                results['has_bird'] = True
+                bird_region = image[y1:y2, x1:x2]
+                species = self._analyze_bird_features(bird_region, bbox_area)
+                detection['species'] = species
+                results['bird_species'] = species
+            
+            results['detections'].append(detection)
+    
+    def classify_dogs(self, results, dog_jobs):
+        """Run the TFLite dog classifier on the dog crops found by YOLO"""
+        # Classify the dogs with TFLite (BGR to RGB happens after
+        # resizing, on the much smaller model input)
+        classifications = self.classify_dogs_pipelined([dog_region for _, dog_region in dog_jobs],
+                                                       bgr=True)
+        
+        for (detection, _), classification in zip(dog_jobs, classifications):
+            # Add classification info to detection
+            detection['dog_classification'] = classification
+            detection['dog_name'] = classification['predicted_class']
+            detection['dog_confidence'] = classification['confidence']
+            
+            # Update results based on classification
+            dog_name = classification['predicted_class'].lower()
+            if 'felix' in dog_name:
+                results['has_felix'] = True
+                results['detected_dogs'].append('Felix')
+            elif 'leia' in dog_name:
+                results['has_leia'] = True
+                results['detected_dogs'].append('Leia')
+            else:
+                results['detected_dogs'].append(classification['predicted_class'])
+            
+            results['dog_classifications'].append(classification)
+    
+    def run_yolo(self, image):
+        """
+        YOLO stage of detect_objects, without the dog classification
+        
+        Returns:
+            tuple: (results dict, list of (detection, dog crop) pairs for classify_dogs)
+        """
+        results = self._new_results()
+        dog_jobs = []
         
         try:
-            # Run YOLO detection first
-            yolo_results = self.yolo_model(image, conf=0.3, verbose=False)
+            yolo_results = self.yolo_model(image, **self._yolo_args)
             
             for result in yolo_results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        class_id = int(box.cls[0])
-                        confidence = float(box.conf[0])
-                        class_name = self.yolo_model.names[class_id]
-                        
-                        # Check if it's one of our target classes
-                        if class_name in self.target_classes:
-                            x1, y1, x2, y2 = box.xyxy[0].tolist()
-                            bbox_area = (x2 - x1) * (y2 - y1)
-                            
-                            detection = {
-                                'class': class_name,
-                                'confidence': confidence,
-                                'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                                'area': bbox_area
-                            }
-                            
-                            # Special handling for dogs - run custom classification
-                            if class_name == 'dog':
-                                results['has_dog'] = True
-                                
-                                # Extract dog region and classify
-                                dog_region = image[int(y1):int(y2), int(x1):int(x2)]
-                                
-                                if dog_region.size > 0:
-                                    # Convert BGR to RGB for TensorFlow Lite
-                                    dog_region_rgb = cv2.cvtColor(dog_region, cv2.COLOR_BGR2RGB)
-                                    
-                                    # Classify the dog with TFLite
-                                    classification = self.classify_dog(dog_region_rgb)
-                                    
-                                    # Add classification info to detection
-                                    detection['dog_classification'] = classification
-                                    detection['dog_name'] = classification['predicted_class']
-                                    detection['dog_confidence'] = classification['confidence']
-                                    
-                                    # Update results based on classification
-                                    dog_name = classification['predicted_class'].lower()
-                                    if 'felix' in dog_name:
-                                        results['has_felix'] = True
-                                        results['detected_dogs'].append('Felix')
-                                    elif 'leia' in dog_name:
-                                        results['has_leia'] = True
-                                        results['detected_dogs'].append('Leia')
-                                    else:
-                                        results['detected_dogs'].append(classification['predicted_class'])
-                                    
-                                    results['dog_classifications'].append(classification)
-                                else:
-                                    # Fallback if dog region extraction fails
-                                    detection['dog_name'] = 'Unknown Dog'
-                                    detection['dog_confidence'] = 0.0
-                                    results['detected_dogs'].append('Unknown Dog')
-                            
-                            elif class_name == 'person':
-                                results['has_person'] = True
-                            
-                            elif class_name == 'bird':
-                                results['has_bird'] = True
-                                bird_region = image[int(y1):int(y2), int(x1):int(x2)]
-                                species = self._analyze_bird_features(bird_region, bbox_area)
-                                detection['species'] = species
-                                results['bird_species'] = species
-                            
-                            results['detections'].append(detection)
-            
-            return results
+                self._process_yolo_result(image, result, results, dog_jobs)
             
         except Exception as e:
             print(f"❌ Error in object detection: {e}")
-            return results
+        
+        return results, dog_jobs
     
-    def draw_detections(self, image, detections):
-        """Draw detection boxes and labels on image"""
-        output_image = image.copy()
+    def detect_objects(self, image):
+        """
+        Detect objects using YOLO, then classify dogs with TensorFlow Lite
+        """
+        results, dog_jobs = self.run_yolo(image)
+        self.classify_dogs(results, dog_jobs)
+        return results
+    
+    def run_yolo_batch(self, images):
+        """
+        Batched YOLO stage: one YOLO call for several frames
+        
+        Returns:
+            list: One (results dict, dog crops) tuple per input frame, in order
+        """
+        if not self.yolo_batchable or len(images) < 2:
+            # Fixed-batch model - one call per frame
+            return [self.run_yolo(image) for image in images]
+        
+        staged = [(self._new_results(), []) for _ in images]
+        
+        try:
+            # One Results object comes back per input image, in input order
+            yolo_results = self.yolo_model(list(images), **self._yolo_args)
+            if len(yolo_results) != len(images):
+                raise RuntimeError(f"YOLO returned {len(yolo_results)} results for {len(images)} frames")
+            
+            for image, result, (results, dog_jobs) in zip(images, yolo_results, staged):
+                self._process_yolo_result(image, result, results, dog_jobs)
+            
+        except Exception as e:
+            print(f"❌ Error in batch object detection, retrying frame by frame: {e}")
+            return [self.run_yolo(image) for image in images]
+        
+        return staged
+    
+    def detect_objects_batch(self, images):
+        """
+        Detect objects in several frames with a single YOLO call
+        
+        Args:
+            images: List of frames (BGR format)
+            
+        Returns:
+            list: One results dict per input frame, in the same order
+        """
+        all_results = []
+        for results, dog_jobs in self.run_yolo_batch(images):
+            self.classify_dogs(results, dog_jobs)
+            all_results.append(results)
+        return all_results
+    
+    def collect(self, frame):
+        """
+        Buffer a frame for batched detection
+        
+        Returns:
+            list: Results for the whole batch once batch_size frames are
+                  buffered, otherwise None
+        """
+        self._frame_buffer.append(frame)
+        if len(self._frame_buffer) < self.batch_size:
+            return None
+        return self.flush()
+    
+    def flush(self):
+        """Run detection on any buffered frames, even if the batch is not full"""
+        frames = list(self._frame_buffer)
+        self._frame_buffer.clear()
+        return self.detect_objects_batch(frames)
+    
+    def draw_detections(self, image, detections, inplace=False):
+        """
+        Draw detection boxes and labels on image
+        
+        Args:
+            image: Image to annotate
+            detections: Results dict from detect_objects
+            inplace: Draw on image itself instead of a copy (saves a
+                     full-frame copy when the caller no longer needs it)
+        """
+        output_image = image if inplace else image.copy()
         
         for detection in detections['detections']:
             x1, y1, x2, y2 = detection['bbox']
@@ -421,21 +1003,15 @@ class SimpleAIDetector:
             confidence = detection['confidence']
             
             # Choose color based on class
-            colors = {
-                'person': (0, 255, 0),    # Green
-                'dog': (255, 0, 0),       # Blue
-                'bird': (0, 0, 255)       # Red
-            }
+            color = CLASS_COLORS.get(class_name, DEFAULT_COLOR)
             
             # Special colors for specific dogs
-            if 'dog_name' in detection:
+            if class_name == 'dog' and 'dog_name' in detection:
                 dog_name = detection['dog_name'].lower()
                 if 'felix' in dog_name:
-                    colors['dog'] = (255, 0, 255)  # Magenta for Felix
+                    color = FELIX_COLOR
                 elif 'leia' in dog_name:
-                    colors['dog'] = (0, 255, 255)  # Cyan for Leia
-            
-            color = colors.get(class_name, (128, 128, 128))
+                    color = LEIA_COLOR
             
             # Draw bounding box
             cv2.rectangle(output_image, (x1, y1), (x2, y2), color, 2)
@@ -449,32 +1025,180 @@ class SimpleAIDetector:
             if 'species' in detection:
                 label += f" ({detection['species']})"
             
-            # Draw label background
-            label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0]
-            cv2.rectangle(output_image, (x1, y1 - label_size[1] - 10), 
-                         (x1 + label_size[0], y1), color, -1)
+            # Draw label background (only the width depends on the text)
+            label_width = cv2.getTextSize(label, LABEL_FONT, 0.5, 2)[0][0]
+            cv2.rectangle(output_image, (x1, y1 - LABEL_HEIGHT - 10), 
+                         (x1 + label_width, y1), color, -1)
             
             # Draw label text
             cv2.putText(output_image, label, (x1, y1 - 5), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
+                       LABEL_FONT, 0.5, (255, 255, 255), 2)
         
         return output_image
     
     def save_detection_result(self, image, detections, filename=None):
-        """Save detection results to file"""
+        """
+        Save detection results to file
+        
+        The boxes are drawn onto image itself, and the JPEG encode and file
+        writes are queued on a background writer so detection isn't held up.
+        """
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"detections/detection_{timestamp}"
         
-        # Save annotated image
-        annotated_image = self.draw_detections(image, detections)
-        cv2.imwrite(f"{filename}.jpg", annotated_image)
+        # The image is only written to disk, so annotate it directly
+        annotated_image = self.draw_detections(image, detections, inplace=True)
         
-        # Save detection data as JSON
-        with open(f"{filename}.json", 'w') as f:
-            json.dump(detections, f, indent=2)
+        # Executor threads are joined at exit, so pending saves still finish
+        self._io_pool.submit(self._write_detection_files, annotated_image, detections, filename)
+    
+    def _write_detection_files(self, annotated_image, detections, filename):
+        """Write the annotated JPEG and detection JSON (runs on a background thread)"""
+        try:
+            cv2.imwrite(f"{filename}.jpg", annotated_image,
+                        [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 0])
+            
+            # Save detection data as compact JSON (only ever read by code)
+            if ORJSON_AVAILABLE:
+                with open(f"{filename}.json", 'wb') as f:
+                    f.write(orjson.dumps(detections, option=orjson.OPT_SERIALIZE_NUMPY))
+            else:
+                with open(f"{filename}.json", 'w') as f:
+                    json.dump(detections, f, separators=(',', ':'))
+            
+            print(f"Detection saved to {filename}.jpg and {filename}.json")
+            
+        except Exception as e:
+            print(f"❌ Error saving detection {filename}: {e}")
+
+
+def _pin_current_thread(cores):
+    """Restrict the calling thread to the given CPU cores (Linux only)"""
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError as e:
+        print(f"⚠️  Could not set CPU affinity: {e}")
+
+
+class DetectionPipeline:
+    """
+    Two-stage detection pipeline on worker threads
+    
+    YOLO runs on one thread and the TFLite dog classifier on another, so
+    YOLO can work on frame N+1 while the dogs from frame N are classified.
+    """
+    
+    def __init__(self, detector, result_callback, queue_size=2, batch_window=0.0):
+        """
+        Args:
+            detector: Initialized SimpleAIDetector
+            result_callback: Called as result_callback(image, detections) per frame
+            queue_size: Frames allowed to wait for dog classification
+            batch_window: Seconds the YOLO stage waits for more frames to batch
+                          (0: batch only frames already queued, so a lone frame
+                          never waits)
+        """
+        self.detector = detector
+        self.result_callback = result_callback
+        self.batch_window = batch_window
+        # Room for a full YOLO batch of motion images to queue up
+        self.frame_queue = queue.Queue(maxsize=max(queue_size, detector.batch_size))
+        self.classify_queue = queue.Queue(maxsize=queue_size)
+        self.threads = []
+        
+        # YOLO gets all but one core, the TFLite classifier gets the last one
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+        if len(cores) >= 4:
+            self.yolo_cores = set(cores[:-1])
+            self.classifier_cores = {cores[-1]}
+            # Pinning only covers threads started from the classifier worker -
+            # an interpreter thread pool made at load time would still spread
+            # over the YOLO cores. One thread per reserved core (one, so no
+            # pool: invoke() runs on the pinned thread)
+            detector.set_dog_classifier_threads(len(self.classifier_cores))
+        else:
+            self.yolo_cores = self.classifier_cores = None
+    
+    def start(self):
+        """Start the YOLO and classifier worker threads"""
+        self.threads = [
+            threading.Thread(target=self._yolo_worker, daemon=True),
+            threading.Thread(target=self._classifier_worker, daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+    
+    def stop(self):
+        """Finish the queued frames and stop the worker threads"""
+        if not self.threads:
+            return
+        self.frame_queue.put(None)  # Sentinel passes through both stages
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+    
+    def submit(self, image):
+        """Queue a frame for detection (blocks while the pipeline is full)"""
+        self.frame_queue.put(image)
+    
+    def _next_batch(self):
+        """Wait for a frame, then gather any more already queued or arriving within batch_window"""
+        images = [self.frame_queue.get()]
+        deadline = time.monotonic() + self.batch_window
         
-        print(f"Detection saved to {filename}.jpg and {filename}.json")
+        # batch_size is 1 for fixed-batch models, so this never waits for them
+        while images[-1] is not None and len(images) < self.detector.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    images.append(self.frame_queue.get(timeout=remaining))
+                else:
+                    images.append(self.frame_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        return images
+    
+    def _yolo_worker(self):
+        """Stage 1: batched YOLO detection + bird analysis, dog crops passed on"""
+        if self.yolo_cores:
+            _pin_current_thread(self.yolo_cores)
+        
+        while True:
+            # Bursts of motion events share one YOLO call
+            images = self._next_batch()
+            stopping = images[-1] is None
+            if stopping:
+                images.pop()
+            
+            if images:
+                for image, (results, dog_jobs) in zip(images, self.detector.run_yolo_batch(images)):
+                    self.classify_queue.put((image, results, dog_jobs))
+            
+            if stopping:
+                self.classify_queue.put(None)
+                break
+    
+    def _classifier_worker(self):
+        """Stage 2: TFLite dog classification, then hand results to the callback"""
+        if self.classifier_cores:
+            _pin_current_thread(self.classifier_cores)
+        
+        while True:
+            item = self.classify_queue.get()
+            if item is None:
+                break
+            
+            image, results, dog_jobs = item
+            self.detector.classify_dogs(results, dog_jobs)
+            
+            try:
+                self.result_callback(image, results)
+            except Exception as e:
+                print(f"❌ Error in detection callback: {e}")
 
 
 # Test function to verify everything works
@@ -501,4 +1225,14 @@ def test_detector():
         return False
 
 if __name__ == "__main__":
-    test_detector()
\ No newline at end of file
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == 'export':
+        # Export YOLO for faster inference:
+        #   python3 ai_detector_simple.py export [ncnn|onnx|openvino] [int8|half]
+        model_format = sys.argv[2] if len(sys.argv) > 2 else 'ncnn'
+        precision = sys.argv[3] if len(sys.argv) > 3 else None
+        SimpleAIDetector().export_yolo_model(model_format, int8=precision == 'int8',
+                                             half=precision == 'half')
+    else:
+        test_detector()
\ No newline at end of file
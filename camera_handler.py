@@ -1,5 +1,7 @@
 import time
+import queue
 import threading
+from collections import deque
 from datetime import datetime
 import os
 import cv2
@@ -13,6 +15,27 @@ except ImportError as e:
     print(f"Picamera2 import failed: {e}")
     raise
 
+# simplejpeg comes with Picamera2 - libjpeg-turbo with a fast DCT, quicker
+# than cv2.imwrite for the full-size captures
+try:
+    import simplejpeg
+    SIMPLEJPEG_AVAILABLE = True
+except ImportError:
+    SIMPLEJPEG_AVAILABLE = False
+
+# Camera stream sizes
+HIGH_RES_SIZE = (2304, 1296)  # 'main' stream, used for AI captures
+MOTION_SIZE = (320, 240)      # 'lores' stream, used for motion detection
+MOTION_FRAME_RATE = 10        # frames/s - each one is checked for motion
+
+# Motion frames kept for temporal differencing (~0.8 s at 10 fps)
+RECENT_FRAMES = 8
+# Frames captured per motion event - the sharpest one goes to the AI
+BURST_FRAMES = 3
+
+# motion_min_area is configured in 640x480 pixels (the old motion frame size)
+MOTION_AREA_SCALE = (MOTION_SIZE[0] * MOTION_SIZE[1]) / (640 * 480)
+
 class MotionDetector:
     def __init__(self, sensitivity=25, min_area=5000, verbose=False):
         """
@@ -26,29 +49,51 @@ class MotionDetector:
         self.sensitivity = sensitivity
         self.min_area = min_area
         self.verbose = verbose
-        self.background_subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=True)
+        # Shadow detection is the most expensive part of MOG2 and the mask is
+        # only used for contour areas, so leave it off
+        self.background_subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=200, varThreshold=sensitivity, detectShadows=False)
         self.camera = None
         self.running = False
         self.motion_callback = None
         self.last_motion_time = 0
         self.motion_cooldown = 2  # seconds between motion detections
         
+        # High-res frames handed from the camera thread to the monitor thread
+        # (one slot - a capture arriving while busy is dropped)
+        self._capture_queue = queue.Queue(maxsize=1)
+        
+        # Recent lores luma planes (ring buffer) and the burst in progress
+        self._recent_frames = deque(maxlen=RECENT_FRAMES)
+        self._burst_remaining = 0
+        self._burst_image = None
+        self._burst_score = -1.0
+        
     def initialize_camera(self):
         """Initialize the Raspberry Pi camera"""
         try:
             self.camera = Picamera2()
             
-            # Configure camera for motion detection (using RGB, not RGBA)
-            config = self.camera.create_preview_configuration(
-                main={"size": (640, 480), "format": "RGB888"},  # Force RGB format
-                lores={"size": (320, 240), "format": "YUV420"},
-                display="lores"
+            # One dual-stream configuration for the lifetime of the camera:
+            # high-res 'main' for AI captures, small 'lores' for motion
+            # detection, so captures never need a mode switch
+            config = self.camera.create_video_configuration(
+                # libcamera's RGB888 is stored [B, G, R] - OpenCV's BGR order
+                main={"size": HIGH_RES_SIZE, "format": "RGB888"},
+                lores={"size": MOTION_SIZE, "format": "YUV420"},
+                controls={"FrameRate": MOTION_FRAME_RATE}
             )
             self.camera.configure(config)
             self.camera.start()
             time.sleep(2)  # Let camera warm up
+            
+            # Checked once here so the per-frame paths never need to handle
+            # RGBA or other channel layouts
+            main_shape = self.camera.capture_array("main").shape
+            if len(main_shape) != 3 or main_shape[2] != 3:
+                raise RuntimeError(f"expected a 3-channel main stream, got shape {main_shape}")
             if self.verbose:
-                print("Camera initialized successfully with RGB format")
+                print("Camera initialized successfully with BGR format")
             return True
         except Exception as e:
             print(f"Failed to initialize camera: {e}")  # Always show errors
@@ -57,98 +102,59 @@ class MotionDetector:
     def capture_high_res_image(self):
         """Capture a high-resolution image for AI analysis"""
         try:
-            # Capture high-resolution image for AI processing
-            # Switch to high-res temporarily
-            self.camera.stop()
-            
-            high_res_config = self.camera.create_still_configuration(
-                main={"size": (2304, 1296), "format": "RGB888"}  # Force RGB format
-            )
-            self.camera.configure(high_res_config)
-            self.camera.start()
-            time.sleep(0.5)  # Brief pause for configuration
-            
-            # Capture the image
-            image = self.camera.capture_array()
-            
-            # Ensure it's 3-channel RGB
-            if len(image.shape) == 3 and image.shape[2] == 4:
-                # Convert RGBA to RGB if needed
-                image = cv2.cvtColor(image, cv2.COLOR_RGBA2RGB)
-            elif len(image.shape) == 3 and image.shape[2] == 3:
-                # Already RGB, but might be BGR, convert to RGB for YOLO
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            
-            # Save a copy of the captured image
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            cv2.imwrite(f"captures/motion_{timestamp}.jpg", cv2.cvtColor(image, cv2.COLOR_RGB2BGR))
-            
-            # Switch back to motion detection mode
-            self.camera.stop()
-            motion_config = self.camera.create_preview_configuration(
-                main={"size": (640, 480), "format": "RGB888"},
-                lores={"size": (320, 240), "format": "YUV420"},
-                display="lores"
-            )
-            self.camera.configure(motion_config)
-            self.camera.start()
-            time.sleep(0.5)  # Brief pause for configuration
-            
-            # Only print image info in verbose mode
-            if self.verbose:
-                print(f"Captured image shape: {image.shape}")
+            # The main stream is already high-res - no reconfiguration needed
+            image = self.camera.capture_array("main")
+            self._save_capture(image)
             return image
             
         except Exception as e:
             print(f"Failed to capture high-res image: {e}")  # Always show errors
-            # Try to restart motion detection mode
-            try:
-                self.camera.stop()
-                motion_config = self.camera.create_preview_configuration(
-                    main={"size": (640, 480), "format": "RGB888"},
-                    lores={"size": (320, 240), "format": "YUV420"},
-                    display="lores"
-                )
-                self.camera.configure(motion_config)
-                self.camera.start()
-            except:
-                pass
             return None
     
+    def _save_capture(self, image):
+        """Save a copy of a captured high-res image"""
+        # Already BGR - YOLO, the crop classifiers and cv2.imwrite all
+        # take it as-is, so no colour conversion passes are needed
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"captures/motion_{timestamp}.jpg"
+        if SIMPLEJPEG_AVAILABLE:
+            jpeg = simplejpeg.encode_jpeg(image, quality=85, colorspace='BGR', fastdct=True)
+            with open(filename, 'wb') as f:
+                f.write(jpeg)
+        else:
+            cv2.imwrite(filename, image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        
+        # Only print image info in verbose mode
+        if self.verbose:
+            print(f"Captured image shape: {image.shape}")
+    
     def detect_motion(self, frame):
         """
         Detect motion in the current frame
         
         Args:
-            frame: Current camera frame
+            frame: Current YUV420 'lores' camera frame
             
         Returns:
             bool: True if motion detected, False otherwise
         """
         try:
-            # Ensure frame is in correct format
-            if len(frame.shape) == 3:
-                if frame.shape[2] == 4:  # RGBA
-                    frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
-                elif frame.shape[2] == 3:  # RGB
-                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (21, 21), 0)
+            # The first H rows of a YUV420 frame are the luma plane - a
+            # grayscale image with no colour conversion (view, no copy)
+            gray = frame[:MOTION_SIZE[1], :MOTION_SIZE[0]]
+            # Half-resolution frame, so a much smaller kernel gives similar smoothing
+            gray = cv2.GaussianBlur(gray, (5, 5), 0)
             
             # Apply background subtraction
             fg_mask = self.background_subtractor.apply(gray)
             
-            # Find contours
-            contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Check if any contour is large enough to be considered motion
-            for contour in contours:
-                if cv2.contourArea(contour) > self.min_area:
-                    return True
+            # Foreground blob areas in one labelling pass (row 0 is background)
+            _, _, stats, _ = cv2.connectedComponentsWithStats(fg_mask, connectivity=8)
             
-            return False
+            # Check if any blob is large enough to be considered motion
+            # (min_area is in 640x480 pixels, the lores frame is smaller)
+            min_area = self.min_area * MOTION_AREA_SCALE
+            return bool(np.any(stats[1:, cv2.CC_STAT_AREA] > min_area))
         except Exception as e:
             if self.verbose:  # Only show motion detection errors in verbose mode
                 print(f"Error in motion detection: {e}")
@@ -164,6 +170,8 @@ class MotionDetector:
             return False
         
         self.running = True
+        # Motion detection runs as each frame arrives instead of polling
+        self.camera.pre_callback = self._on_frame
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -175,43 +183,97 @@ class MotionDetector:
         """Stop motion monitoring"""
         self.running = False
         if hasattr(self, 'monitor_thread'):
+            self._capture_queue.put(None)  # Wake the monitor thread so it exits
             self.monitor_thread.join()
         if self.camera:
             self.camera.stop()
         if self.verbose:
             print("Motion monitoring stopped")
     
-    def _monitor_loop(self):
-        """Main monitoring loop"""
-        while self.running:
-            try:
-                # Capture frame for motion detection
-                frame = self.camera.capture_array()
+    def _on_frame(self, request):
+        """Picamera2 pre_callback - check every new lores frame for motion"""
+        if not self.running:
+            return
+        
+        try:
+            lores = request.make_array("lores")
+            gray = lores[:MOTION_SIZE[1], :MOTION_SIZE[0]]
+            
+            # Check for motion (every frame, so the background model keeps up)
+            motion = self.detect_motion(lores)
+            
+            if self._burst_remaining:
+                self._add_burst_frame(request, gray)
+            elif motion and self._confirm_motion(gray):
+                current_time = time.time()
                 
-                # Check for motion
-                if self.detect_motion(frame):
-                    current_time = time.time()
+                # Check cooldown period
+                if current_time - self.last_motion_time > self.motion_cooldown:
+                    self.last_motion_time = current_time
                     
-                    # Check cooldown period
-                    if current_time - self.last_motion_time > self.motion_cooldown:
-                        self.last_motion_time = current_time
-                        
-                        # Only print motion detection in verbose mode
-                        if self.verbose:
-                            print(f"Motion detected at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        # Capture high-resolution image
-                        high_res_image = self.capture_high_res_image()
+                    # Only print motion detection in verbose mode
+                    if self.verbose:
+                        print(f"Motion detected at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                    
+                    # Start a burst - this and the next frames compete on sharpness
+                    self._burst_remaining = BURST_FRAMES
+                    self._burst_score = -1.0
+                    self._add_burst_frame(request, gray)
+            
+            self._recent_frames.append(gray)
                         
-                        # Call callback if set
-                        if self.motion_callback and high_res_image is not None:
-                            self.motion_callback(high_res_image)
+        except Exception as e:
+            print(f"Error in frame callback: {e}")  # Always show critical errors
+    
+    def _confirm_motion(self, gray):
+        """
+        Confirm MOG2 motion with a plain difference against the oldest
+        buffered frame, filtering out background-model glitches
+        """
+        if not self._recent_frames:
+            return True
+        
+        diff = cv2.absdiff(gray, self._recent_frames[0])
+        changed = np.count_nonzero(diff > self.sensitivity)
+        return changed > self.min_area * MOTION_AREA_SCALE
+    
+    def _add_burst_frame(self, request, gray):
+        """Keep the request's high-res image if it is the sharpest of the burst"""
+        # Variance of the Laplacian - higher means more edge detail, less blur
+        score = cv2.Laplacian(gray, cv2.CV_16S).var()
+        if score > self._burst_score:
+            self._burst_score = score
+            self._burst_image = request.make_array("main")
+        
+        self._burst_remaining -= 1
+        if self._burst_remaining:
+            return
+        
+        # Burst done - saving it and the callback run on the monitor thread,
+        # not the camera's
+        try:
+            self._capture_queue.put_nowait(self._burst_image)
+        except queue.Full:
+            if self.verbose:
+                print("Previous capture still being handled - skipping")
+        self._burst_image = None
+    
+    def _monitor_loop(self):
+        """Main monitoring loop - handles high-res captures from _on_frame"""
+        while True:
+            high_res_image = self._capture_queue.get()
+            if high_res_image is None:
+                break
+            
+            try:
+                self._save_capture(high_res_image)
                 
-                time.sleep(0.1)  # Small delay to prevent excessive CPU usage
+                # Call callback if set
+                if self.motion_callback:
+                    self.motion_callback(high_res_image)
                 
             except Exception as e:
                 print(f"Error in monitoring loop: {e}")  # Always show critical errors
-                time.sleep(1)
 
 # Create directories for storing captures
 os.makedirs("captures", exist_ok=True)
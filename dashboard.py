@@ -4,186 +4,624 @@ Bird Watcher Web Dashboard
 Enhanced version with separate motion/AI detection views and Felix/Leia tracking
 """
 
-from flask import Flask, render_template, jsonify, send_from_directory
+from flask import Flask, jsonify, send_from_directory, request, abort, Response
+from werkzeug.utils import safe_join
+from jinja2 import ChoiceLoader, DictLoader
 import os
 import json
-import glob
+import heapq
+import bisect
+import functools
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional
 from detection_stats import DetectionStats
 
+# orjson is optional - parses the detection JSON files several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# msgspec is optional - decodes detection JSON straight into a typed struct,
+# faster than building a dict and skipping fields we never read
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+# Flask-Caching is optional - without it every request recomputes the page
+try:
+    from flask_caching import Cache
+    FLASK_CACHING_AVAILABLE = True
+except ImportError:
+    FLASK_CACHING_AVAILABLE = False
+
+# watchdog is optional - with it the summary is only rebuilt when files
+# change (inotify) instead of on a fixed timer
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# waitress is optional - a production WSGI server with a request thread
+# pool, used instead of Flask's development server when installed
+try:
+    from waitress import serve
+    WAITRESS_AVAILABLE = True
+except ImportError:
+    WAITRESS_AVAILABLE = False
+
 app = Flask(__name__)
 
 # Configuration
 CAPTURES_DIR = "captures"
 DETECTIONS_DIR = "detections"
 STATIC_DIR = "static"
+DETECTIONS_DB = "detections.db"
+
+# File names written by the monitor: captures/motion_<ts>.jpg and
+# detections/detection_<ts>.jpg + .json
+MOTION_PREFIX = "motion_"
+DETECTION_PREFIX = "detection_"
+IMAGE_SUFFIX = ".jpg"
+JSON_SUFFIX = ".json"
+
+# Cache lifetimes (seconds) - the page itself refreshes every 30s
+PAGE_CACHE_TIMEOUT = 10
+
+# How often the background thread rebuilds the dashboard summary (seconds)
+SUMMARY_REFRESH_INTERVAL = 5
+# With watchdog: rebuild at least this often anyway, to keep the 'time ago'
+# text and session stats moving while no files change
+IDLE_REFRESH_INTERVAL = 60
+
+# Threads reading new detection JSON files - SD card reads overlap while
+# each one waits on I/O
+JSON_READ_WORKERS = 8
+
+# Browser cache lifetime for capture/detection images (seconds) - the files
+# never change once written, and revalidation after that is a cheap 304
+IMAGE_MAX_AGE = 60
+
+# When nginx fronts the dashboard, hand image bytes to it with
+# X-Accel-Redirect instead of streaming them through Python. Set to the
+# internal location prefix (e.g. "/_files"), with nginx serving
+# <prefix>/captures/ and <prefix>/detections/ - see commands. None serves
+# images from Flask
+X_ACCEL_PREFIX = None
+
+# waitress request threads - enough for a page load (HTML, /api/stats and
+# six images) to be served in parallel rather than queueing
+SERVER_THREADS = 8
+
+class _NullCache:
+    """Stand-in for flask_caching.Cache that leaves functions uncached"""
+    def cached(self, *args, **kwargs):
+        return lambda func: func
+
+if FLASK_CACHING_AVAILABLE:
+    cache = Cache(app, config={
+        'CACHE_TYPE': 'SimpleCache',
+        'CACHE_DEFAULT_TIMEOUT': PAGE_CACHE_TIMEOUT
+    })
+else:
+    cache = _NullCache()
 
 # Create necessary directories
 os.makedirs(STATIC_DIR, exist_ok=True)
-os.makedirs("templates", exist_ok=True)
+
+if WATCHDOG_AVAILABLE:
+    class _FileChangeHandler(FileSystemEventHandler):
+        """Flags that a watched directory gained, lost or rewrote a file"""
+        def __init__(self, changed_event):
+            super().__init__()
+            self.changed_event = changed_event
+        
+        def on_any_event(self, event):
+            if not event.is_directory and event.event_type in ('created', 'modified', 'deleted', 'moved'):
+                self.changed_event.set()
+
+# time_ago resolution (seconds) - timestamps in the same bucket share a string
+TIME_AGO_BUCKET = 10
+
+# 'time ago' units: upper bounds (seconds) and the (divisor, suffix) used
+# below each one - past the last bound it's days
+TIME_AGO_LIMITS = (60, 3600, 86400)
+TIME_AGO_UNITS = ((None, "Just now"), (60, "m ago"), (3600, "h ago"), (86400, "d ago"))
+
+@functools.lru_cache(maxsize=256)
+def _time_ago_cached(mtime_bucket, now_bucket):
+    """'time ago' text for two TIME_AGO_BUCKET-second bucket numbers"""
+    seconds = (now_bucket - mtime_bucket) * TIME_AGO_BUCKET
+    
+    divisor, suffix = TIME_AGO_UNITS[bisect.bisect_right(TIME_AGO_LIMITS, seconds)]
+    if divisor is None:
+        return suffix
+    return f"{seconds // divisor}{suffix}"
+
+if MSGSPEC_AVAILABLE:
+    class DetectionRecord(msgspec.Struct):
+        """The fields of a detection JSON file the dashboard uses"""
+        has_person: bool = False
+        has_dog: bool = False
+        has_felix: bool = False
+        has_leia: bool = False
+        has_bird: bool = False
+        bird_species: Optional[str] = None
+        detections: list = []
+    
+    _detection_decoder = msgspec.json.Decoder(DetectionRecord)
+else:
+    class DetectionRecord:
+        """The fields of a detection JSON file the dashboard uses"""
+        __slots__ = ('has_person', 'has_dog', 'has_felix', 'has_leia', 'has_bird',
+                     'bird_species', 'detections')
+        
+        def __init__(self, has_person=False, has_dog=False, has_felix=False, has_leia=False,
+                     has_bird=False, bird_species=None, detections=(), **other_fields):
+            self.has_person = has_person
+            self.has_dog = has_dog
+            self.has_felix = has_felix
+            self.has_leia = has_leia
+            self.has_bird = has_bird
+            self.bird_species = bird_species
+            self.detections = detections
+
+# What reading a missing, truncated or malformed detection file can raise
+# (orjson/json decode errors are ValueErrors; TypeError is a non-object)
+DETECTION_READ_ERRORS = (OSError, ValueError, TypeError)
+if MSGSPEC_AVAILABLE:
+    DETECTION_READ_ERRORS += (msgspec.DecodeError,)
+
+def load_detection_file(path):
+    """Read a detection JSON file into a DetectionRecord"""
+    if MSGSPEC_AVAILABLE:
+        with open(path, 'rb') as f:
+            return _detection_decoder.decode(f.read())
+    return DetectionRecord(**load_json_file(path))
+
+@functools.lru_cache(maxsize=512)
+def _detection_info_cached(path, mtime):
+    """
+    Dashboard summary of a detection JSON file
+    
+    Keyed by mtime as well as path, so a rewritten file is parsed again
+    while unchanged files (nearly all of them) are never re-read
+    """
+    record = load_detection_file(path)
+    
+    # Build detection summary
+    detected_objects = []
+    if record.has_person:
+        detected_objects.append('Person')
+    if record.has_felix:
+        detected_objects.append('Felix')
+    elif record.has_leia:
+        detected_objects.append('Leia')
+    elif record.has_dog:
+        detected_objects.append('Dog')
+    if record.has_bird:
+        detected_objects.append(record.bird_species or 'Bird')
+    
+    return {
+        'has_person': record.has_person,
+        'has_dog': record.has_dog,
+        'has_felix': record.has_felix,
+        'has_leia': record.has_leia,
+        'has_bird': record.has_bird,
+        'bird_species': record.bird_species,
+        'detection_count': len(record.detections),
+        'detected_objects': detected_objects,
+        'summary': ', '.join(detected_objects) if detected_objects else 'No objects'
+    }
+
+def _read_detection_record(path):
+    """load_detection_file for the reader pool - None if unreadable"""
+    try:
+        return load_detection_file(path)
+    except DETECTION_READ_ERRORS:
+        return None
+
+def load_json_file(path):
+    """Read and parse a JSON file, with orjson when it's installed"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
 
 class DashboardData:
     def __init__(self):
         self.stats = DetectionStats()
+        
+        # SQLite index of the detection JSON files, so counts are a single
+        # query and only new or changed files ever get parsed
+        self._db_lock = threading.Lock()
+        self._db = self.open_detections_db()
+        self._indexed_mtimes = dict(self._db.execute("SELECT filename, mtime FROM detections"))
+        
+        # Directory listings keyed by path -> (directory mtime, entries)
+        self._scan_cache = {}
+        # Filtered file lists keyed by (path, prefix, suffix) -> (listing, files)
+        self._files_cache = {}
+        
+        # Latest summary, rebuilt off the request path. Requests only read
+        # the reference, and assigning a new dict is atomic, so no lock
+        self._snapshot = None
+        self._files_changed = threading.Event()
+        self._stop_refresh = threading.Event()
+        # Directories the watcher covers - ones missing at startup are
+        # picked up by the refresh loop once they appear
+        self._watched_dirs = set()
+        self._observer = self.start_file_watcher() if WATCHDOG_AVAILABLE else None
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresh_thread.start()
+    
+    def start_file_watcher(self):
+        """Watch the capture/detection directories for new or removed files"""
+        try:
+            observer = Observer()
+            self._watch_handler = _FileChangeHandler(self._files_changed)
+            self._watch_new_dirs(observer)
+            observer.daemon = True
+            observer.start()
+            return observer
+        except Exception as e:
+            print(f"⚠️  File watcher unavailable, refreshing every {SUMMARY_REFRESH_INTERVAL}s: {e}")
+            return None
+    
+    def _watch_new_dirs(self, observer):
+        """
+        Schedule watches for capture/detection directories that exist now
+        but aren't watched yet
+        
+        Returns:
+            True once every directory is being watched
+        """
+        watch_dirs = (CAPTURES_DIR, DETECTIONS_DIR)
+        for directory in watch_dirs:
+            if directory not in self._watched_dirs and os.path.isdir(directory):
+                try:
+                    observer.schedule(self._watch_handler, directory, recursive=False)
+                    self._watched_dirs.add(directory)
+                except Exception as e:
+                    print(f"⚠️  Could not watch {directory}: {e}")
+        return len(self._watched_dirs) == len(watch_dirs)
+    
+    def open_detections_db(self):
+        """Open (creating if needed) the detection metadata index"""
+        db = sqlite3.connect(DETECTIONS_DB, check_same_thread=False)
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS detections (
+                filename TEXT PRIMARY KEY,
+                mtime REAL,
+                has_felix INTEGER,
+                has_leia INTEGER,
+                has_person INTEGER,
+                has_bird INTEGER,
+                species TEXT
+            )""")
+        db.execute("CREATE INDEX IF NOT EXISTS idx_mtime ON detections(mtime)")
+        db.commit()
+        return db
+    
+    def _refresh_loop(self):
+        """
+        Rebuild the summary snapshot - on file changes when the watcher is
+        running, otherwise every SUMMARY_REFRESH_INTERVAL seconds. Until
+        both directories exist (and are watched) it keeps polling, since
+        a missing directory produces no events
+        """
+        while not self._stop_refresh.is_set():
+            try:
+                self._snapshot = self.compute_summary_data()
+            except Exception as e:
+                print(f"❌ Error refreshing dashboard data: {e}")
+            
+            if self._observer is None or not self._watch_new_dirs(self._observer):
+                self._stop_refresh.wait(SUMMARY_REFRESH_INTERVAL)
+                continue
+            
+            # Let a burst of writes (JPEG + JSON) settle, then sleep until
+            # the next change or the idle refresh
+            if self._stop_refresh.wait(1):
+                break
+            self._files_changed.wait(IDLE_REFRESH_INTERVAL)
+            self._files_changed.clear()
+    
+    def stop(self):
+        """Stop the refresh thread and file watcher"""
+        self._stop_refresh.set()
+        # Wake the loop if it's waiting for a file change
+        self._files_changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+        self._refresh_thread.join(timeout=5)
     
     def get_summary_data(self):
-        """Get all data needed for dashboard"""
+        """Get all data needed for dashboard (latest background snapshot)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Requested before the first refresh finished
+            snapshot = self._snapshot = self.compute_summary_data()
+        return snapshot
+    
+    def get_api_data(self, fields=None):
+        """
+        Summary data for /api/stats
+        
+        Args:
+            fields: Keys to return (default: all). Fields the page doesn't
+                    render are only computed when included here
+        """
+        data = self.get_summary_data()
+        lazy_fields = {
+            'confidence_averages': self.stats.get_confidence_averages,
+            'hourly_breakdown': lambda: self.stats.get_hourly_breakdown(12)
+        }
+        
+        if fields is None:
+            fields = list(data) + list(lazy_fields)
+        
+        api_data = {}
+        for field in fields:
+            if field in lazy_fields:
+                api_data[field] = lazy_fields[field]()
+            elif field in data:
+                api_data[field] = data[field]
+        return api_data
+    
+    def compute_summary_data(self):
+        """Build all data needed for dashboard from the stats and files on disk"""
         summary = self.stats.get_session_summary()
-        confidence_averages = self.stats.get_confidence_averages()
-        hourly_breakdown = self.stats.get_hourly_breakdown(12)
         
-        # Get recent motion captures and AI detections separately
-        recent_motion_captures = self.get_recent_motion_captures(limit=3)
-        recent_ai_detections = self.get_recent_ai_detections(limit=3)
+        # Scan each directory once and share the listings between the
+        # helpers (DirEntry caches each file's stat)
+        files = self.scan_dirs()
+        # One clock read shared by every 'time ago' in this snapshot
+        now_ts = time.time()
+        
+        # Get recent motion captures and AI detections separately. The
+        # newest capture also gives the system status its last activity,
+        # so find the top few once and hand them to both
+        newest_captures = heapq.nlargest(3, files['captures'], key=lambda entry: entry.stat().st_mtime)
+        recent_motion_captures = self.get_recent_motion_captures(limit=3, capture_files=newest_captures,
+                                                                 now_ts=now_ts)
+        recent_ai_detections = self.get_recent_ai_detections(limit=3, detection_files=files['detections_jpg'],
+                                                             json_files=files['detections_json'], now_ts=now_ts)
         
         # Calculate some additional metrics
         total_detections = sum(summary['detections'].values())
         detection_rate = (total_detections / summary['motion_events'] * 100) if summary['motion_events'] > 0 else 0
         
         # Get specific dog counts
-        felix_count, leia_count = self.get_dog_counts()
+        felix_count, leia_count = self.get_dog_counts(json_files=files['detections_json'])
+        
+        latest_mtime = newest_captures[0].stat().st_mtime if newest_captures else None
         
         return {
             'summary': summary,
-            'confidence_averages': confidence_averages,
-            'hourly_breakdown': hourly_breakdown,
             'recent_motion_captures': recent_motion_captures,
             'recent_ai_detections': recent_ai_detections,
             'total_detections': total_detections,
             'detection_rate': round(detection_rate, 1),
-            'system_status': self.get_system_status(),
+            'system_status': self.get_system_status(files['captures'], now_ts=now_ts, latest_mtime=latest_mtime),
             'felix_count': felix_count,
             'leia_count': leia_count
         }
     
-    def get_recent_motion_captures(self, limit=3):
-        """Get recent motion capture files (just the motion events)"""
-        capture_files = glob.glob(os.path.join(CAPTURES_DIR, "motion_*.jpg"))
+    def scan_files(self, directory, prefix, suffix):
+        """
+        List files in directory named prefix*suffix
         
-        if not capture_files:
+        Returns os.DirEntry objects - their stat() result is cached, so
+        sorting by mtime and reading it back costs one stat per file
+        """
+        entries = self.scan_dir(directory)
+        
+        # The filtered list is reused for as long as the listing it came from
+        key = (directory, prefix, suffix)
+        cached = self._files_cache.get(key)
+        if cached is not None and cached[0] is entries:
+            return cached[1]
+        
+        files = [entry for entry in entries
+                 if entry.name.startswith(prefix) and entry.name.endswith(suffix)
+                 and entry.is_file(follow_symlinks=False)]
+        self._files_cache[key] = (entries, files)
+        return files
+    
+    def scan_dir(self, directory):
+        """
+        os.scandir listing, reused until the directory's own mtime changes
+        (which happens whenever a file is added, removed or renamed)
+        """
+        try:
+            dir_mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
             return []
         
-        # Sort by modification time (newest first)
-        capture_files.sort(key=os.path.getmtime, reverse=True)
+        cached = self._scan_cache.get(directory)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+        
+        entries = list(os.scandir(directory))
+        self._scan_cache[directory] = (dir_mtime, entries)
+        return entries
+    
+    def scan_dirs(self):
+        """
+        One scandir per directory, split into the file lists the dashboard
+        uses: motion captures, detection images and detection JSON
+        """
+        detection_files = self.scan_files(DETECTIONS_DIR, DETECTION_PREFIX, "")
+        return {
+            'captures': self.scan_files(CAPTURES_DIR, MOTION_PREFIX, IMAGE_SUFFIX),
+            'detections_jpg': [entry for entry in detection_files if entry.name.endswith(IMAGE_SUFFIX)],
+            'detections_json': [entry for entry in detection_files if entry.name.endswith(JSON_SUFFIX)]
+        }
+    
+    def get_recent_motion_captures(self, limit=3, capture_files=None, now_ts=None):
+        """Get recent motion capture files (just the motion events)"""
+        if capture_files is None:
+            capture_files = self.scan_files(CAPTURES_DIR, MOTION_PREFIX, IMAGE_SUFFIX)
+        
+        # Newest first - only the top few are needed, so skip the full sort
+        newest = heapq.nlargest(limit, capture_files, key=lambda entry: entry.stat().st_mtime)
+        if now_ts is None:
+            now_ts = time.time()
         
         recent = []
-        for file_path in capture_files[:limit]:
+        for entry in newest:
             try:
-                filename = os.path.basename(file_path)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+                filename = entry.name
+                mtime = entry.stat().st_mtime
+                mod_time = datetime.fromtimestamp(mtime)
                 
                 recent.append({
                     'filename': filename,
                     'timestamp': mod_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'time_ago': self.time_ago(mod_time),
+                    'time_ago': self.time_ago_from_floats(now_ts, mtime),
                     'type': 'motion'
                 })
-            except:
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping capture {entry.name}: {e}")
                 continue
         
         return recent
     
-    def get_recent_ai_detections(self, limit=3):
+    def get_recent_ai_detections(self, limit=3, detection_files=None, json_files=None, now_ts=None):
         """Get recent AI detection files (with bounding boxes)"""
-        detection_files = glob.glob(os.path.join(DETECTIONS_DIR, "detection_*.jpg"))
+        if detection_files is None:
+            detection_files = self.scan_files(DETECTIONS_DIR, DETECTION_PREFIX, IMAGE_SUFFIX)
+        if json_files is None:
+            json_files = self.scan_files(DETECTIONS_DIR, DETECTION_PREFIX, JSON_SUFFIX)
         
-        if not detection_files:
-            return []
+        # Pair images with their JSON by file stem - no exists() stat per image
+        json_entries = {entry.name[:-len(JSON_SUFFIX)]: entry for entry in json_files}
         
-        # Sort by modification time (newest first)
-        detection_files.sort(key=os.path.getmtime, reverse=True)
+        # Newest first - only the top few are needed, so skip the full sort
+        newest = heapq.nlargest(limit, detection_files, key=lambda entry: entry.stat().st_mtime)
+        if now_ts is None:
+            now_ts = time.time()
         
         recent = []
-        for file_path in detection_files[:limit]:
+        for entry in newest:
             try:
-                filename = os.path.basename(file_path)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+                filename = entry.name
+                mtime = entry.stat().st_mtime
+                mod_time = datetime.fromtimestamp(mtime)
                 
                 # Try to find corresponding JSON file with detection data
-                json_file = file_path.replace('.jpg', '.json')
+                json_file = json_entries.get(filename[:-len(IMAGE_SUFFIX)])
                 detection_info = None
                 
-                if os.path.exists(json_file):
+                if json_file is not None:
                     try:
-                        with open(json_file, 'r') as f:
-                            detection_data = json.load(f)
-                            
-                            # Build detection summary
-                            detected_objects = []
-                            if detection_data.get('has_person', False):
-                                detected_objects.append('Person')
-                            if detection_data.get('has_felix', False):
-                                detected_objects.append('Felix')
-                            elif detection_data.get('has_leia', False):
-                                detected_objects.append('Leia')
-                            elif detection_data.get('has_dog', False):
-                                detected_objects.append('Dog')
-                            if detection_data.get('has_bird', False):
-                                bird_species = detection_data.get('bird_species', 'Bird')
-                                detected_objects.append(bird_species)
-                            
-                            detection_info = {
-                                'has_person': detection_data.get('has_person', False),
-                                'has_dog': detection_data.get('has_dog', False),
-                                'has_felix': detection_data.get('has_felix', False),
-                                'has_leia': detection_data.get('has_leia', False),
-                                'has_bird': detection_data.get('has_bird', False),
-                                'bird_species': detection_data.get('bird_species', None),
-                                'detection_count': len(detection_data.get('detections', [])),
-                                'detected_objects': detected_objects,
-                                'summary': ', '.join(detected_objects) if detected_objects else 'No objects'
-                            }
-                    except:
-                        pass
+                        detection_info = _detection_info_cached(json_file.path, json_file.stat().st_mtime)
+                    except DETECTION_READ_ERRORS as e:
+                        print(f"⚠️  Unreadable detection file {json_file.name}: {e}")
                 
                 recent.append({
                     'filename': filename,
                     'timestamp': mod_time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'time_ago': self.time_ago(mod_time),
+                    'time_ago': self.time_ago_from_floats(now_ts, mtime),
                     'detection_info': detection_info,
                     'type': 'detection'
                 })
-            except:
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Skipping detection {entry.name}: {e}")
                 continue
         
         return recent
     
-    def get_dog_counts(self):
-        """Get specific counts for Felix and Leia"""
-        felix_count = 0
-        leia_count = 0
+    def sync_detections_db(self, json_files=None):
+        """Index new/changed detection JSON files and drop deleted ones"""
+        if json_files is None:
+            json_files = self.scan_files(DETECTIONS_DIR, DETECTION_PREFIX, JSON_SUFFIX)
         
-        # Check detection JSON files for Felix/Leia counts
-        detection_files = glob.glob(os.path.join(DETECTIONS_DIR, "detection_*.json"))
+        with self._db_lock:
+            seen = set()
+            new_files = []
+            for entry in json_files:
+                try:
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
+                seen.add(entry.name)
+                
+                # Only new or rewritten files need parsing
+                if self._indexed_mtimes.get(entry.name) != mtime:
+                    new_files.append((entry, mtime))
+            
+            # Read a backlog of files in parallel (e.g. the first run)
+            paths = [entry.path for entry, _ in new_files]
+            if len(paths) > 1:
+                with ThreadPoolExecutor(max_workers=JSON_READ_WORKERS) as pool:
+                    records = list(pool.map(_read_detection_record, paths))
+            else:
+                records = [_read_detection_record(path) for path in paths]
+            
+            rows = []
+            for (entry, mtime), record in zip(new_files, records):
+                if record is None:
+                    continue
+                rows.append((entry.name, mtime, bool(record.has_felix), bool(record.has_leia),
+                             bool(record.has_person), bool(record.has_bird), record.bird_species))
+                self._indexed_mtimes[entry.name] = mtime
+            
+            deleted = [(filename,) for filename in set(self._indexed_mtimes) - seen]
+            for (filename,) in deleted:
+                del self._indexed_mtimes[filename]
+            
+            if rows or deleted:
+                self._db.executemany("INSERT OR REPLACE INTO detections VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.executemany("DELETE FROM detections WHERE filename = ?", deleted)
+                self._db.commit()
+    
+    def get_dog_counts(self, json_files=None):
+        """Get specific counts for Felix and Leia"""
+        self.sync_detections_db(json_files)
         
-        for json_file in detection_files:
-            try:
-                with open(json_file, 'r') as f:
-                    detection_data = json.load(f)
-                    
-                if detection_data.get('has_felix', False):
-                    felix_count += 1
-                if detection_data.get('has_leia', False):
-                    leia_count += 1
-                    
-            except:
-                continue
+        with self._db_lock:
+            felix_count, leia_count = self._db.execute(
+                "SELECT COALESCE(SUM(has_felix), 0), COALESCE(SUM(has_leia), 0) FROM detections"
+            ).fetchone()
         
         return felix_count, leia_count
     
-    def get_system_status(self):
-        """Get system status information"""
+    def get_system_status(self, capture_files=None, now_ts=None, latest_mtime=None):
+        """
+        Get system status information
+        
+        Args:
+            capture_files: Motion capture entries (default: scan CAPTURES_DIR)
+            now_ts: Current time, epoch seconds (default: now)
+            latest_mtime: mtime of the newest capture, if the caller already
+                          knows it - saves a pass over every capture
+        """
         # Check when last detection occurred
-        capture_files = glob.glob(os.path.join(CAPTURES_DIR, "motion_*.jpg"))
+        if capture_files is None:
+            capture_files = self.scan_files(CAPTURES_DIR, MOTION_PREFIX, IMAGE_SUFFIX)
         
         if capture_files:
-            latest_file = max(capture_files, key=os.path.getmtime)
-            last_activity = datetime.fromtimestamp(os.path.getmtime(latest_file))
-            hours_since = (datetime.now() - last_activity).total_seconds() / 3600
+            if latest_mtime is None:
+                latest_mtime = max(entry.stat().st_mtime for entry in capture_files)
+            if now_ts is None:
+                now_ts = time.time()
+            hours_since = (now_ts - latest_mtime) / 3600
             
             if hours_since < 1:
                 status = "active"
-                status_text = f"Last activity: {self.time_ago(last_activity)}"
+                status_text = f"Last activity: {self.time_ago_from_floats(now_ts, latest_mtime)}"
             elif hours_since < 24:
                 status = "recent"
                 status_text = f"Last activity: {hours_since:.1f} hours ago"
@@ -197,53 +635,82 @@ class DashboardData:
         return {
             'status': status,
             'status_text': status_text,
-            'total_captures': len(capture_files) if capture_files else 0
+            'total_captures': len(capture_files)
         }
     
     def time_ago(self, timestamp):
         """Convert timestamp to human-readable 'time ago' format"""
-        now = datetime.now()
-        diff = now - timestamp
-        
-        if diff.total_seconds() < 60:
-            return "Just now"
-        elif diff.total_seconds() < 3600:
-            minutes = int(diff.total_seconds() / 60)
-            return f"{minutes}m ago"
-        elif diff.total_seconds() < 86400:
-            hours = int(diff.total_seconds() / 3600)
-            return f"{hours}h ago"
-        else:
-            days = int(diff.total_seconds() / 86400)
-            return f"{days}d ago"
+        return self.time_ago_from_floats(time.time(), timestamp.timestamp())
+    
+    def time_ago_from_floats(self, now_ts, mtime):
+        """time_ago for epoch seconds - no datetime objects or subtraction"""
+        # Memoized per 10s bucket - repeat renders reuse the same strings
+        return _time_ago_cached(int(mtime) // TIME_AGO_BUCKET, int(now_ts) // TIME_AGO_BUCKET)
 
 # Initialize dashboard data
 dashboard_data = DashboardData()
 
 @app.route('/')
+@cache.cached(timeout=PAGE_CACHE_TIMEOUT)
 def index():
     """Main dashboard page"""
     data = dashboard_data.get_summary_data()
-    return render_template('dashboard.html', **data)
+    # The template only uses the summary data, so render it directly rather
+    # than through render_template's lookup and context processors
+    return dashboard_template.render(**data)
 
 @app.route('/api/stats')
+@cache.cached(timeout=PAGE_CACHE_TIMEOUT, query_string=True)
 def api_stats():
-    """JSON API endpoint for live updates"""
-    data = dashboard_data.get_summary_data()
+    """JSON API endpoint for live updates (?fields=a,b for a subset)"""
+    fields = request.args.get('fields')
+    data = dashboard_data.get_api_data(fields.split(',') if fields else None)
     return jsonify(data)
 
+@app.after_request
+def add_page_etag(response):
+    """
+    ETag the page and stats responses, answering unchanged ones with 304
+    
+    Done after the (cached) view so the cache always holds the full page
+    """
+    if request.endpoint in ('index', 'api_stats') and response.status_code == 200:
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+def serve_image(directory, filename):
+    """Send an image from directory - via nginx when X_ACCEL_PREFIX is set"""
+    if X_ACCEL_PREFIX is None:
+        return send_from_directory(directory, filename, conditional=True, max_age=IMAGE_MAX_AGE)
+    
+    # Same path checks as send_from_directory; nginx does the rest
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    return Response(headers={
+        'X-Accel-Redirect': f"{X_ACCEL_PREFIX}/{directory}/{filename}",
+        'Content-Type': 'image/jpeg',
+        'Cache-Control': f"public, max-age={IMAGE_MAX_AGE}"
+    })
+
 @app.route('/captures/<filename>')
 def serve_capture(filename):
     """Serve capture images"""
-    return send_from_directory(CAPTURES_DIR, filename)
+    return serve_image(CAPTURES_DIR, filename)
 
 @app.route('/detections/<filename>')
 def serve_detection(filename):
     """Serve detection images"""
-    return send_from_directory(DETECTIONS_DIR, filename)
+    return serve_image(DETECTIONS_DIR, filename)
 
 def create_html_template():
-    """Create the HTML template file"""
+    """
+    Register the HTML template with Flask straight from memory
+    
+    Returns:
+        The compiled dashboard template
+    """
     template_content = '''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -477,8 +944,8 @@ def create_html_template():
     <div class="container">
         <div class="header">
             <h1>🐦 Bird Watcher Dashboard</h1>
-            <p>Session running for {{ summary.session_duration }}</p>
-            <span class="status-badge status-{{ system_status.status }}">
+            <p id="session-duration">Session running for {{ summary.session_duration }}</p>
+            <span id="status-badge" class="status-badge status-{{ system_status.status }}">
                 {{ system_status.status_text }}
             </span>
         </div>
@@ -488,15 +955,15 @@ def create_html_template():
                 <h2>📊 Detection Summary</h2>
                 <div class="stats-grid">
                     <div class="stat-item">
-                        <div class="stat-number">{{ summary.detections.person }}</div>
+                        <div class="stat-number" id="person-count">{{ summary.detections.person }}</div>
                         <div class="stat-label">👤 People</div>
                     </div>
                     <div class="stat-item">
-                        <div class="stat-number">{{ summary.detections.dog }}</div>
+                        <div class="stat-number" id="dog-count">{{ summary.detections.dog }}</div>
                         <div class="stat-label">🐕 Dogs</div>
                     </div>
                     <div class="stat-item">
-                        <div class="stat-number">{{ summary.detections.bird }}</div>
+                        <div class="stat-number" id="bird-count">{{ summary.detections.bird }}</div>
                         <div class="stat-label">🐦 Birds</div>
                     </div>
                 </div>
@@ -506,19 +973,19 @@ def create_html_template():
                 <h2>🐕 Dog Detections</h2>
                 <div class="stats-grid">
                     <div class="stat-item felix-stat">
-                        <div class="stat-number">{{ felix_count }}</div>
+                        <div class="stat-number" id="felix-count">{{ felix_count }}</div>
                         <div class="stat-label">🐕 Felix</div>
                     </div>
                     <div class="stat-item leia-stat">
-                        <div class="stat-number">{{ leia_count }}</div>
+                        <div class="stat-number" id="leia-count">{{ leia_count }}</div>
                         <div class="stat-label">🐕 Leia</div>
                     </div>
                     <div class="stat-item">
-                        <div class="stat-number">{{ summary.motion_events }}</div>
+                        <div class="stat-number" id="motion-events">{{ summary.motion_events }}</div>
                         <div class="stat-label">Motion Events</div>
                     </div>
                     <div class="stat-item">
-                        <div class="stat-number">{{ detection_rate }}%</div>
+                        <div class="stat-number" id="detection-rate">{{ detection_rate }}%</div>
                         <div class="stat-label">Detection Rate</div>
                     </div>
                 </div>
@@ -527,10 +994,11 @@ def create_html_template():
             {% if summary.bird_species %}
             <div class="card">
                 <h2>🐦 Bird Species</h2>
-                {% for species, count in summary.bird_species.items() %}
+                {# Sorted like the page script compares them (and like jsonify sends them) #}
+                {% for species, count in summary.bird_species | dictsort(true) %}
                 <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
                     <span>{{ species }}</span>
-                    <strong>{{ count }}</strong>
+                    <strong id="species-count-{{ loop.index0 }}">{{ count }}</strong>
                 </div>
                 {% endfor %}
             </div>
@@ -547,7 +1015,7 @@ def create_html_template():
                             <div class="capture-item">
                                 <img src="/captures/{{ capture.filename }}" alt="Motion Capture" onclick="window.open(this.src, '_blank')">
                                 <div class="capture-info">
-                                    <div class="capture-time">{{ capture.time_ago }}</div>
+                                    <div class="capture-time" id="time-ago-{{ loop.index0 }}">{{ capture.time_ago }}</div>
                                     <div class="motion-indicator">Motion Event</div>
                                 </div>
                             </div>
@@ -566,7 +1034,7 @@ def create_html_template():
                             <div class="capture-item">
                                 <img src="/detections/{{ detection.filename }}" alt="AI Detection" onclick="window.open(this.src, '_blank')">
                                 <div class="capture-info">
-                                    <div class="capture-time">{{ detection.time_ago }}</div>
+                                    <div class="capture-time" id="time-ago-{{ loop.index0 + recent_motion_captures|length }}">{{ detection.time_ago }}</div>
                                     {% if detection.detection_info %}
                                     <div class="detection-badges">
                                         {% if detection.detection_info.has_person %}
@@ -613,10 +1081,53 @@ def create_html_template():
     </div>
     
     <script>
-        // Auto-refresh every 30 seconds
-        setInterval(function() {
-            location.reload();
-        }, 30000);
+        // What the page is showing - a change in either needs a re-render
+        var shownFiles = {{ (recent_motion_captures + recent_ai_detections) | map(attribute='filename') | list | tojson }};
+        var shownSpecies = {{ summary.bird_species | dictsort(true) | map('first') | list | tojson }};
+        
+        function setText(id, value) {
+            var element = document.getElementById(id);
+            if (element) {
+                element.textContent = value;
+            }
+        }
+        
+        // Poll the JSON API every 30 seconds and patch the numbers in place
+        async function refreshStats() {
+            try {
+                const response = await fetch('/api/stats?fields=summary,system_status,felix_count,leia_count,detection_rate,recent_motion_captures,recent_ai_detections');
+                const data = await response.json();
+                const recent = data.recent_motion_captures.concat(data.recent_ai_detections);
+                // Sorted, so the check doesn't depend on the API's key order
+                const species = Object.keys(data.summary.bird_species).sort();
+                
+                // New images or species - re-render (unchanged thumbnails
+                // come from the browser cache)
+                if (JSON.stringify(recent.map(item => item.filename)) !== JSON.stringify(shownFiles) ||
+                    JSON.stringify(species) !== JSON.stringify(shownSpecies)) {
+                    location.reload();
+                    return;
+                }
+                
+                setText('session-duration', 'Session running for ' + data.summary.session_duration);
+                const badge = document.getElementById('status-badge');
+                badge.className = 'status-badge status-' + data.system_status.status;
+                badge.textContent = data.system_status.status_text;
+                
+                setText('person-count', data.summary.detections.person);
+                setText('dog-count', data.summary.detections.dog);
+                setText('bird-count', data.summary.detections.bird);
+                setText('felix-count', data.felix_count);
+                setText('leia-count', data.leia_count);
+                setText('motion-events', data.summary.motion_events);
+                setText('detection-rate', data.detection_rate + '%');
+                species.forEach((name, i) => setText('species-count-' + i, data.summary.bird_species[name]));
+                recent.forEach((item, i) => setText('time-ago-' + i, item.time_ago));
+            } catch (error) {
+                console.log('Stats refresh failed:', error);
+            }
+        }
+        setInterval(refreshStats, 30000);
         
         // Show last updated time
         console.log('Dashboard loaded at:', new Date().toLocaleString());
@@ -624,17 +1135,23 @@ def create_html_template():
 </body>
 </html>'''
     
-    with open('templates/dashboard.html', 'w') as f:
-        f.write(template_content)
+    # Jinja compiles it once on first render - no file to write, re-read
+    # or stat on the SD card
+    app.jinja_loader = ChoiceLoader([
+        DictLoader({'dashboard.html': template_content}),
+        app.jinja_loader
+    ])
+    
+    # Compile now instead of on the first request; it never changes at runtime
+    app.jinja_env.auto_reload = False
+    return app.jinja_env.get_template('dashboard.html')
+
+dashboard_template = create_html_template()
 
 def main():
     """Main function to run the dashboard"""
     print("🚀 Setting up Bird Watcher Web Dashboard...")
     
-    # Create template file
-    create_html_template()
-    print("✅ Created HTML template")
-    
     # Check if required directories exist
     if not os.path.exists(CAPTURES_DIR):
         print(f"⚠️  Warning: {CAPTURES_DIR} directory not found")
@@ -649,7 +1166,7 @@ def main():
         import socket
         hostname = socket.gethostname()
         local_ip = socket.gethostbyname(hostname)
-    except:
+    except OSError:
         local_ip = "YOUR_PI_IP"
     
     print("\n" + "="*50)
@@ -670,11 +1187,18 @@ def main():
     print("⏹️  Press Ctrl+C to stop the dashboard")
     print("="*50)
     
-    # Run the Flask app
+    # Run the Flask app - one process, so every request thread shares the
+    # background summary snapshot
     try:
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        if WAITRESS_AVAILABLE:
+            serve(app, host='0.0.0.0', port=5000, threads=SERVER_THREADS)
+        else:
+            print("💡 pip3 install waitress for a faster multi-threaded server")
+            app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
     except KeyboardInterrupt:
         print("\n👋 Dashboard stopped!")
+    finally:
+        dashboard_data.stop()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
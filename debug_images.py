@@ -5,16 +5,32 @@ Debug script to check why dashboard isn't showing images
 
 import os
 import json
-import glob
+import heapq
 from datetime import datetime
 
+CAPTURES_DIR = "captures"
+DETECTIONS_DIR = "detections"
+CAPTURE_PREFIX, CAPTURE_SUFFIX = "motion_", ".jpg"
+DETECTION_PREFIX, DETECTION_SUFFIX = "detection_", ".json"
+
+def list_files(directory, prefix, suffix):
+    """
+    One scandir pass over directory
+    
+    Returns:
+        List of (path, name, mtime) for files named prefix*suffix
+    """
+    with os.scandir(directory) as entries:
+        return [(entry.path, entry.name, entry.stat().st_mtime) for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(suffix)]
+
 def debug_images():
     print("🔍 DEBUGGING DASHBOARD IMAGES")
     print("="*50)
     
     # Check directories
-    captures_dir = "captures"
-    detections_dir = "detections"
+    captures_dir = CAPTURES_DIR
+    detections_dir = DETECTIONS_DIR
     
     print(f"📁 Checking directories...")
     print(f"   Captures dir exists: {os.path.exists(captures_dir)}")
@@ -29,8 +45,8 @@ def debug_images():
         return
     
     # Count files
-    capture_files = glob.glob(os.path.join(captures_dir, "motion_*.jpg"))
-    detection_files = glob.glob(os.path.join(detections_dir, "detection_*.json"))
+    capture_files = list_files(captures_dir, CAPTURE_PREFIX, CAPTURE_SUFFIX)
+    detection_files = list_files(detections_dir, DETECTION_PREFIX, DETECTION_SUFFIX)
     
     print(f"\n📊 File counts:")
     print(f"   Capture images: {len(capture_files)}")
@@ -48,37 +64,41 @@ def debug_images():
     
     # Check recent captures
     print(f"\n📷 Recent capture files:")
-    recent_captures = sorted(capture_files, key=os.path.getmtime, reverse=True)[:5]
-    for i, file_path in enumerate(recent_captures):
-        filename = os.path.basename(file_path)
-        mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+    recent_captures = heapq.nlargest(5, capture_files, key=lambda item: item[2])
+    for i, (file_path, filename, mtime) in enumerate(recent_captures):
+        mod_time = datetime.fromtimestamp(mtime)
         print(f"   {i+1}. {filename} - {mod_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Check recent detections
     print(f"\n🎯 Recent detection files:")
-    recent_detections = sorted(detection_files, key=os.path.getmtime, reverse=True)[:5]
-    for i, file_path in enumerate(recent_detections):
-        filename = os.path.basename(file_path)
-        mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+    recent_detections = heapq.nlargest(5, detection_files, key=lambda item: item[2])
+    for i, (file_path, filename, mtime) in enumerate(recent_detections):
+        mod_time = datetime.fromtimestamp(mtime)
         print(f"   {i+1}. {filename} - {mod_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Test the filtering logic
     print(f"\n🔍 Testing image filtering logic...")
     valid_images = []
     
-    for file_path in recent_captures[:10]:  # Test first 10
-        filename = os.path.basename(file_path)
-        
+    # Open sidecars relative to the detections directory - one lookup each,
+    # and a missing file is just FileNotFoundError (no separate exists())
+    detections_fd = os.open(detections_dir, os.O_RDONLY | os.O_DIRECTORY)
+    
+    for file_path, filename, _ in recent_captures[:10]:  # Test first 10
         # Try to find corresponding detection file
-        detection_file = file_path.replace('captures/', 'detections/').replace('.jpg', '.json')
+        detection_name = os.path.splitext(filename)[0] + ".json"
+        try:
+            detection_fd = os.open(detection_name, os.O_RDONLY, dir_fd=detections_fd)
+        except FileNotFoundError:
+            detection_fd = None
         
         print(f"\n   Testing: {filename}")
-        print(f"   Looking for: {os.path.basename(detection_file)}")
-        print(f"   Detection file exists: {os.path.exists(detection_file)}")
+        print(f"   Looking for: {detection_name}")
+        print(f"   Detection file exists: {detection_fd is not None}")
         
-        if os.path.exists(detection_file):
+        if detection_fd is not None:
             try:
-                with open(detection_file, 'r') as f:
+                with open(detection_fd, 'r') as f:
                     detection_data = json.load(f)
                 
                 has_person = detection_data.get('has_person', False)
@@ -98,11 +118,13 @@ def debug_images():
                 else:
                     print(f"   ❌ FILTERED OUT (no valid detections)")
                     
-            except Exception as e:
+            except (OSError, ValueError, AttributeError) as e:
                 print(f"   ❌ Error reading detection file: {e}")
         else:
             print(f"   ❌ No corresponding detection file")
     
+    os.close(detections_fd)
+    
     print(f"\n📊 SUMMARY:")
     print(f"   Total captures: {len(capture_files)}")
     print(f"   Total detections: {len(detection_files)}")
@@ -124,16 +146,17 @@ def debug_images():
     if len(recent_detections) > 0:
         print(f"\n📄 Sample detection file structure:")
         try:
-            with open(recent_detections[0], 'r') as f:
+            sample_path, sample_name, _ = recent_detections[0]
+            with open(sample_path, 'r') as f:
                 sample_data = json.load(f)
             
-            print(f"   File: {os.path.basename(recent_detections[0])}")
+            print(f"   File: {sample_name}")
             print(f"   Keys: {list(sample_data.keys())}")
             if 'detections' in sample_data:
                 print(f"   Detection count: {len(sample_data['detections'])}")
                 if sample_data['detections']:
                     print(f"   Sample detection: {sample_data['detections'][0]}")
-        except Exception as e:
+        except (OSError, ValueError) as e:
             print(f"   Error reading sample: {e}")
 
 if __name__ == "__main__":
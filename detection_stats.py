@@ -4,46 +4,145 @@ Detection Statistics Tracker
 Tracks and summarizes all detections since system started
 """
 
+import copy
 import json
+import math
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
-import glob
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from collections import Counter, deque
+from itertools import islice
+
+# orjson is optional - encodes/decodes the stats file and log several
+# times faster than the json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def dumps_json(obj, pretty=False):
+    """Encode obj as UTF-8 JSON bytes (indented when pretty)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def loads_json(data):
+    """Decode JSON from bytes or str"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Time buckets kept for the breakdowns: a week of hours and a month of days
+HOURLY_BUCKETS = 168
+DAILY_BUCKETS = 30
+# Most recent individual detections kept in detection_log
+DETECTION_LOG_SIZE = 100
+# Threads reading detection files in analyze_existing_detections - SD card
+# reads overlap while each one waits on I/O
+ANALYZE_WORKERS = 8
+
+def hour_bucket(timestamp):
+    """Integer key of timestamp's local hour (hours since 0001-01-01)"""
+    return timestamp.toordinal() * 24 + timestamp.hour
+
+def day_bucket(timestamp):
+    """Integer key of timestamp's local day (date ordinal)"""
+    return timestamp.toordinal()
+
+def empty_confidence_stats():
+    """
+    Running moments of one object type's confidence scores - constant size
+    however many detections are recorded, and enough to recover the mean
+    and standard deviation
+    """
+    return {'count': 0, 'sum': 0.0, 'sum_sq': 0.0, 'min': 0.0, 'max': 0.0}
+
+def confidence_stats_from_list(confidences):
+    """Convert the old list-of-scores confidence_stats format to moments"""
+    moments = empty_confidence_stats()
+    if confidences:
+        moments.update({
+            'count': len(confidences),
+            'sum': sum(confidences),
+            'sum_sq': sum(c * c for c in confidences),
+            'min': min(confidences),
+            'max': max(confidences)
+        })
+    return moments
+
+def empty_stats(session_start):
+    """Statistics with nothing recorded yet"""
+    return {
+        'session_start': session_start.isoformat(),
+        'total_motion_events': 0,
+        'total_detections': 0,
+        'detections_by_type': {
+            'person': 0,
+            'dog': 0,
+            'bird': 0
+        },
+        'bird_species': Counter(),
+        'confidence_stats': {
+            'person': empty_confidence_stats(),
+            'dog': empty_confidence_stats(),
+            'bird': empty_confidence_stats()
+        },
+        # (key, counts) per hour/day, oldest first - older buckets
+        # drop off the front, so neither grows without bound
+        'hourly_stats': deque(maxlen=HOURLY_BUCKETS),
+        'daily_stats': deque(maxlen=DAILY_BUCKETS),
+        'detection_log': deque(maxlen=DETECTION_LOG_SIZE)
+    }
 
 class DetectionStats:
     def __init__(self, stats_file='detection_stats.json'):
         """Initialize detection statistics tracker"""
         self.stats_file = stats_file
+        # Events since the last snapshot of stats_file, one JSON line each -
+        # appending a line costs the same however long the history gets
+        self.wal_file = os.path.splitext(stats_file)[0] + '.wal'
+        self._wal = None
+        self._wal_replayed = False
+        self._snapshot_id = None
+        # Log lines are written by a background thread (started on the
+        # first event), tagged with the snapshot generation they follow
+        self._wal_queue = None
+        self._generation = 0
+        # First generation the current log file holds - older events are
+        # already in the snapshot on disk
+        self._wal_generation = 0
+        # Guards the log file (_wal, _snapshot_id, _wal_replayed,
+        # _wal_generation) and _generation changes - the log writer and
+        # snapshot writes hold it, not _lock, while on the SD card, so
+        # recording never waits on disk
+        self._wal_lock = threading.Lock()
+        # Whether anything changed since stats_file was last written
+        self._dirty = False
+        self._lock = threading.Lock()
         self.session_start = datetime.now()
-        self.stats = {
-            'session_start': self.session_start.isoformat(),
-            'total_motion_events': 0,
-            'total_detections': 0,
-            'detections_by_type': {
-                'person': 0,
-                'dog': 0,
-                'bird': 0
-            },
-            'bird_species': defaultdict(int),
-            'confidence_stats': {
-                'person': [],
-                'dog': [],
-                'bird': []
-            },
-            'hourly_stats': defaultdict(lambda: {'person': 0, 'dog': 0, 'bird': 0}),
-            'daily_stats': defaultdict(lambda: {'person': 0, 'dog': 0, 'bird': 0}),
-            'detection_log': []
-        }
+        # Session length comes from the monotonic clock, so a wall clock
+        # step (NTP sync on an RTC-less Pi) can't distort it
+        self._session_start_monotonic = time.monotonic()
+        self.stats = empty_stats(self.session_start)
         self.load_stats()
     
     def load_stats(self):
         """Load existing statistics from file"""
         if os.path.exists(self.stats_file):
             try:
-                with open(self.stats_file, 'r') as f:
-                    saved_stats = json.load(f)
+                with open(self.stats_file, 'rb') as f:
+                    saved_stats = loads_json(f.read())
                 
                 # Merge with current session
+                # Identifies the snapshot, so a log from before it isn't replayed
+                self._snapshot_id = saved_stats.get('last_updated')
+                
                 if 'detections_by_type' in saved_stats:
                     for obj_type, count in saved_stats['detections_by_type'].items():
                         self.stats['detections_by_type'][obj_type] = count
@@ -57,84 +156,286 @@ class DetectionStats:
                 if 'total_detections' in saved_stats:
                     self.stats['total_detections'] = saved_stats['total_detections']
                 
+                if 'confidence_stats' in saved_stats:
+                    for obj_type, moments in saved_stats['confidence_stats'].items():
+                        # Files written before running moments hold every score
+                        if isinstance(moments, list):
+                            moments = confidence_stats_from_list(moments)
+                        self.stats['confidence_stats'][obj_type] = moments
+                
+                for stats_key, bucket_key, key_format in (('hourly_stats', hour_bucket, '%Y-%m-%d_%H'),
+                                                          ('daily_stats', day_bucket, '%Y-%m-%d')):
+                    buckets = saved_stats.get(stats_key)
+                    # Older files saved a {key: counts} dict
+                    if isinstance(buckets, dict):
+                        buckets = sorted(buckets.items())
+                    for key, counts in buckets or ():
+                        # ...keyed by date strings rather than integers
+                        if isinstance(key, str):
+                            key = bucket_key(datetime.strptime(key, key_format))
+                        self.stats[stats_key].append((key, counts))
+                
+                if 'detection_log' in saved_stats:
+                    self.stats['detection_log'].extend(saved_stats['detection_log'])
+                
                 print(f"Loaded existing stats: {self.stats['total_detections']} total detections")
                 
             except Exception as e:
                 print(f"Could not load existing stats: {e}")
+        
+        self.replay_wal()
     
-    def save_stats(self):
-        """Save statistics to file"""
+    def replay_wal(self):
+        """Apply the events logged since the snapshot in stats_file"""
+        if not os.path.exists(self.wal_file):
+            return
+        
         try:
-            # Convert defaultdicts to regular dicts for JSON serialization
-            stats_to_save = {
-                'session_start': self.stats['session_start'],
-                'last_updated': datetime.now().isoformat(),
-                'total_motion_events': self.stats['total_motion_events'],
-                'total_detections': self.stats['total_detections'],
-                'detections_by_type': dict(self.stats['detections_by_type']),
-                'bird_species': dict(self.stats['bird_species']),
-                'confidence_stats': self.stats['confidence_stats'],
-                'hourly_stats': {k: dict(v) for k, v in self.stats['hourly_stats'].items()},
-                'daily_stats': {k: dict(v) for k, v in self.stats['daily_stats'].items()},
-                'detection_log': self.stats['detection_log'][-100:]  # Keep last 100 events
-            }
-            
-            with open(self.stats_file, 'w') as f:
-                json.dump(stats_to_save, f, indent=2)
+            with open(self.wal_file, 'rb') as f:
+                header = f.readline()
+                # A log written before the current snapshot is already in it
+                if not header or loads_json(header).get('snapshot') != self._snapshot_id:
+                    return
                 
+                for line in f:
+                    try:
+                        event = loads_json(line)
+                    except ValueError:
+                        continue  # Line torn by a crash mid-write
+                    
+                    if event['event'] == 'motion':
+                        self.stats['total_motion_events'] += 1
+                        self._dirty = True
+                    else:
+                        self.apply_detections(datetime.fromisoformat(event['timestamp']),
+                                              event['detections'])
+            
+            self._wal_replayed = True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not replay stats log: {e}")
+    
+    def queue_wal(self, event):
+        """
+        Hand an event to the log writer thread (call with _lock held), so
+        recording never waits on the SD card
+        """
+        if self._wal_queue is None:
+            self._wal_queue = queue.Queue()
+            threading.Thread(target=self._wal_writer_loop, daemon=True).start()
+        self._wal_queue.put((self._generation, event))
+    
+    def _wal_writer_loop(self):
+        """Append queued events to the log, a batch per write"""
+        while True:
+            batch = [self._wal_queue.get()]
+            # Coalesce whatever else queued up meanwhile into the same write
+            while True:
+                try:
+                    batch.append(self._wal_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            with self._wal_lock:
+                # Events queued before a snapshot are already in it
+                events = [event for generation, event in batch if generation >= self._wal_generation]
+                if events:
+                    try:
+                        self.append_wal(events)
+                    except OSError as e:
+                        print(f"Error writing stats log: {e}")
+    
+    def append_wal(self, events):
+        """Log events - save_stats folds the log into the next snapshot (call with _wal_lock held)"""
+        if self._wal is None:
+            if self._wal_replayed:
+                self._wal = open(self.wal_file, 'ab', buffering=0)
+            else:
+                # Start a fresh log for the current snapshot
+                self._wal = open(self.wal_file, 'wb', buffering=0)
+                self._wal.write(dumps_json({'snapshot': self._snapshot_id}) + b'\n')
+                self._wal_replayed = True
+        
+        # Unbuffered - the batch reaches the file in a single write
+        self._wal.write(b''.join(dumps_json(event) + b'\n' for event in events))
+    
+    def save_stats(self):
+        """Save statistics to file (skipped if nothing changed since the last save)"""
+        try:
+            # _wal_lock before _lock - the log can't move on to the new
+            # snapshot until that snapshot is on disk
+            with self._wal_lock:
+                with self._lock:
+                    # A quiet night shouldn't mean a snapshot a minute on the SD card
+                    if not self._dirty:
+                        return
+                    stats_to_save = self.take_snapshot()
+                self.write_snapshot(stats_to_save)
         except Exception as e:
             print(f"Error saving stats: {e}")
     
+    def take_snapshot(self):
+        """
+        Copy the stats for write_snapshot and start a new log generation
+        (call with _wal_lock and _lock held)
+        """
+        # A deep copy, so recording can carry on while the copy is written -
+        # the deques (detection_log holds the last DETECTION_LOG_SIZE events)
+        # become lists for serializing
+        stats_to_save = copy.deepcopy(self.stats)
+        stats_to_save['last_updated'] = datetime.now().isoformat()
+        for key in ('hourly_stats', 'daily_stats', 'detection_log'):
+            stats_to_save[key] = list(stats_to_save[key])
+        
+        # Events recorded from here on aren't in the copy - they go in the
+        # new snapshot's log
+        self._generation += 1
+        self._dirty = False
+        return stats_to_save
+    
+    def write_snapshot(self, stats_to_save):
+        """Write stats_file and start a new event log (call with _wal_lock held, not _lock)"""
+        try:
+            # Replace the file in one step - a crash never leaves half a snapshot.
+            # Snapshots are only periodic, so syncing each one to the SD card
+            # before the rename is cheap (and recording isn't blocked meanwhile)
+            temp_file = self.stats_file + '.tmp'
+            with open(temp_file, 'wb') as f:
+                f.write(dumps_json(stats_to_save, pretty=True))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.stats_file)
+        except Exception:
+            # The old snapshot and log still stand (later events keep going
+            # into that log) - keep the changes for the next save
+            with self._lock:
+                self._dirty = True
+            raise
+        
+        # Everything logged so far is in the snapshot - the next event
+        # starts a new log
+        self._snapshot_id = stats_to_save['last_updated']
+        self._wal_generation = self._generation
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
+        self._wal_replayed = False
+    
+    def reset_stats(self):
+        """Replace stats_file with empty statistics and discard the event log"""
+        with self._wal_lock:
+            with self._lock:
+                self.stats = empty_stats(datetime.now())
+                stats_to_save = self.take_snapshot()
+            # Written like any snapshot (temp file + rename), so a reader
+            # never sees a missing or half-written stats_file
+            self.write_snapshot(stats_to_save)
+            
+            # The new snapshot's id doesn't match the old log's header, so it
+            # would never be replayed - remove it rather than leave it around
+            try:
+                os.remove(self.wal_file)
+            except FileNotFoundError:
+                pass
+    
     def record_motion_event(self):
         """Record a motion detection event"""
-        self.stats['total_motion_events'] += 1
-        self.save_stats()
+        with self._lock:
+            self.stats['total_motion_events'] += 1
+            self._dirty = True
+            self.queue_wal({'event': 'motion'})
     
     def record_detection(self, detections):
         """Record detection results"""
         timestamp = datetime.now()
         
-        # Count detections
+        # Only what apply_detections reads goes in the log
+        logged = []
         for detection in detections['detections']:
+            entry = {'class': detection['class'], 'confidence': detection['confidence']}
+            if 'species' in detection:
+                entry['species'] = detection['species']
+            logged.append(entry)
+        
+        with self._lock:
+            self.apply_detections(timestamp, logged)
+            self.queue_wal({'event': 'detection', 'timestamp': timestamp.isoformat(), 'detections': logged})
+    
+    def apply_detections(self, timestamp, detections):
+        """Add one image's detections (made at timestamp) to the stats"""
+        if not detections:
+            return
+        self._dirty = True
+        
+        # Same for every detection in the image - work the keys out once.
+        # Integers: cheaper to build and hash than date strings, and only
+        # turned into labels by the breakdown helpers
+        hour_key = hour_bucket(timestamp)
+        day_key = day_bucket(timestamp)
+        iso_timestamp = timestamp.isoformat()
+        hour_counts = self.current_bucket(self.stats['hourly_stats'], hour_key)
+        day_counts = self.current_bucket(self.stats['daily_stats'], day_key)
+        
+        # Bind the containers once - a flock means many passes of this loop
+        stats = self.stats
+        detections_by_type = stats['detections_by_type']
+        confidence_stats = stats['confidence_stats']
+        bird_species = stats['bird_species']
+        detection_log = stats['detection_log']
+        
+        # Count detections
+        for detection in detections:
             obj_type = detection['class']
             confidence = detection['confidence']
             
             # Update counters
-            self.stats['detections_by_type'][obj_type] += 1
-            self.stats['total_detections'] += 1
+            detections_by_type[obj_type] += 1
             
             # Track confidence
-            self.stats['confidence_stats'][obj_type].append(confidence)
-            
-            # Track hourly stats
-            hour_key = timestamp.strftime('%Y-%m-%d_%H')
-            self.stats['hourly_stats'][hour_key][obj_type] += 1
+            moments = confidence_stats[obj_type]
+            if moments['count'] == 0:
+                moments['min'] = moments['max'] = confidence
+            elif confidence < moments['min']:
+                moments['min'] = confidence
+            elif confidence > moments['max']:
+                moments['max'] = confidence
+            moments['count'] += 1
+            moments['sum'] += confidence
+            moments['sum_sq'] += confidence * confidence
             
-            # Track daily stats
-            day_key = timestamp.strftime('%Y-%m-%d')
-            self.stats['daily_stats'][day_key][obj_type] += 1
+            # Track hourly and daily stats
+            hour_counts[obj_type] += 1
+            day_counts[obj_type] += 1
             
             # Track bird species
             if obj_type == 'bird' and 'species' in detection:
                 species = detection['species']
-                self.stats['bird_species'][species] += 1
+                bird_species[species] += 1
             
             # Add to detection log
             log_entry = {
-                'timestamp': timestamp.isoformat(),
+                'timestamp': iso_timestamp,
                 'type': obj_type,
                 'confidence': confidence
             }
             if 'species' in detection:
                 log_entry['species'] = detection['species']
             
-            self.stats['detection_log'].append(log_entry)
+            detection_log.append(log_entry)
+        
+        stats['total_detections'] += len(detections)
+    
+    def current_bucket(self, buckets, key):
+        """Counts for key - the newest bucket, or a new one pushed after it"""
+        if buckets and buckets[-1][0] == key:
+            return buckets[-1][1]
         
-        self.save_stats()
+        counts = {'person': 0, 'dog': 0, 'bird': 0}
+        buckets.append((key, counts))
+        return counts
     
     def get_session_summary(self):
         """Get summary for current session"""
-        session_duration = datetime.now() - self.session_start
+        session_duration = timedelta(seconds=time.monotonic() - self._session_start_monotonic)
         
         summary = {
             'session_duration': str(session_duration).split('.')[0],  # Remove microseconds
@@ -147,53 +448,64 @@ class DetectionStats:
         
         return summary
     
+    def recent_tail(self, count=5):
+        """Last count detection_log entries, oldest first"""
+        # Walks only the tail of the deque - no copy of the whole log
+        with self._lock:
+            tail = list(islice(reversed(self.stats['detection_log']), count))
+        tail.reverse()
+        return tail
+    
     def get_confidence_averages(self):
         """Get average confidence scores for each object type"""
         averages = {}
-        for obj_type, confidences in self.stats['confidence_stats'].items():
-            if confidences:
+        for obj_type, moments in self.stats['confidence_stats'].items():
+            count = moments['count']
+            if count:
+                average = moments['sum'] / count
+                # Clamp rounding error below zero for near-identical scores
+                variance = max(moments['sum_sq'] / count - average * average, 0.0)
                 averages[obj_type] = {
-                    'average': sum(confidences) / len(confidences),
-                    'count': len(confidences),
-                    'min': min(confidences),
-                    'max': max(confidences)
+                    'average': average,
+                    'stddev': math.sqrt(variance),
+                    'count': count,
+                    'min': moments['min'],
+                    'max': moments['max']
                 }
             else:
-                averages[obj_type] = {'average': 0, 'count': 0, 'min': 0, 'max': 0}
+                averages[obj_type] = {'average': 0, 'stddev': 0, 'count': 0, 'min': 0, 'max': 0}
         
         return averages
     
     def get_hourly_breakdown(self, hours=24):
         """Get detection breakdown for last N hours"""
         breakdown = {}
-        now = datetime.now()
+        now_key = hour_bucket(datetime.now())
+        with self._lock:
+            hourly_stats = dict(self.stats['hourly_stats'])
         
         for i in range(hours):
-            hour_time = now - timedelta(hours=i)
-            hour_key = hour_time.strftime('%Y-%m-%d_%H')
-            hour_label = hour_time.strftime('%H:00')
+            hour_key = now_key - i
+            hour_label = f"{hour_key % 24:02d}:00"
             
-            if hour_key in self.stats['hourly_stats']:
-                breakdown[hour_label] = dict(self.stats['hourly_stats'][hour_key])
-            else:
-                breakdown[hour_label] = {'person': 0, 'dog': 0, 'bird': 0}
+            counts = hourly_stats.get(hour_key)
+            breakdown[hour_label] = dict(counts) if counts else {'person': 0, 'dog': 0, 'bird': 0}
         
         return breakdown
     
     def get_daily_breakdown(self, days=7):
         """Get detection breakdown for last N days"""
         breakdown = {}
-        now = datetime.now()
+        now_key = day_bucket(datetime.now())
+        with self._lock:
+            daily_stats = dict(self.stats['daily_stats'])
         
         for i in range(days):
-            day_time = now - timedelta(days=i)
-            day_key = day_time.strftime('%Y-%m-%d')
-            day_label = day_time.strftime('%m-%d')
+            day_key = now_key - i
+            day_label = date.fromordinal(day_key).strftime('%m-%d')
             
-            if day_key in self.stats['daily_stats']:
-                breakdown[day_label] = dict(self.stats['daily_stats'][day_key])
-            else:
-                breakdown[day_label] = {'person': 0, 'dog': 0, 'bird': 0}
+            counts = daily_stats.get(day_key)
+            breakdown[day_label] = dict(counts) if counts else {'person': 0, 'dog': 0, 'bird': 0}
         
         return breakdown
     
@@ -218,7 +530,7 @@ class DetectionStats:
         # Bird species breakdown
         if summary['bird_species']:
             print("\n🐦 BIRD SPECIES DETECTED:")
-            for species, count in sorted(summary['bird_species'].items(), key=lambda x: x[1], reverse=True):
+            for species, count in self.stats['bird_species'].most_common():
                 print(f"   • {species}: {count}")
         
         # Confidence averages
@@ -248,12 +560,29 @@ class DetectionStats:
               f"👤{summary['detections']['person']} 🐕{summary['detections']['dog']} 🐦{summary['detections']['bird']} | "
               f"Total: {summary['total_detections']}")
 
+def list_detection_files(directory="detections"):
+    """Paths of the detection_*.json files in directory, from one scandir pass"""
+    if not os.path.isdir(directory):
+        return []
+    with os.scandir(directory) as entries:
+        return [entry.path for entry in entries
+                if entry.name.startswith("detection_") and entry.name.endswith(".json")]
+
+def read_detection_file(file_path):
+    """Parse one detection JSON file - None (after a message) if unreadable"""
+    try:
+        with open(file_path, 'rb') as f:
+            return loads_json(f.read())
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+
 def analyze_existing_detections():
     """Analyze existing detection files to build historical stats"""
     print("🔍 Analyzing existing detection files...")
     
     stats = DetectionStats()
-    detection_files = glob.glob("detections/detection_*.json")
+    detection_files = list_detection_files()
     
     if not detection_files:
         print("No existing detection files found.")
@@ -261,18 +590,19 @@ def analyze_existing_detections():
     
     print(f"Found {len(detection_files)} detection files to analyze...")
     
-    for file_path in detection_files:
-        try:
-            with open(file_path, 'r') as f:
-                detection_data = json.load(f)
-            
+    # Read and parse in parallel, then add everything up on this thread
+    with ThreadPoolExecutor(max_workers=ANALYZE_WORKERS) as pool:
+        results = list(pool.map(read_detection_file, detection_files))
+    
+    timestamp = datetime.now()
+    with stats._lock:
+        for detection_data in results:
             # Simulate recording this detection
-            if 'detections' in detection_data:
-                stats.record_detection(detection_data)
-        
-        except Exception as e:
-            print(f"Error reading {file_path}: {e}")
+            if detection_data is not None and 'detections' in detection_data:
+                stats.apply_detections(timestamp, detection_data['detections'])
     
+    # One snapshot holds the lot - nothing goes through the event log
+    stats.save_stats()
     print(f"✅ Analysis complete. Found {stats.stats['total_detections']} total detections.")
     return stats
 
@@ -7,6 +7,7 @@ Tracks detections and provides summaries with reduced output
 import os
 import sys
 import signal
+import threading
 import time
 import json
 from datetime import datetime
@@ -14,7 +15,7 @@ import logging
 
 # Import our custom modules
 from camera_handler import MotionDetector
-from ai_detector_simple import SimpleAIDetector
+from ai_detector_simple import SimpleAIDetector, DetectionPipeline
 from detection_stats import DetectionStats
 
 class MonitoringSystemWithStats:
@@ -22,12 +23,15 @@ class MonitoringSystemWithStats:
         """Initialize the monitoring system with statistics"""
         self.motion_detector = None
         self.ai_detector = None
+        self.detection_pipeline = None
         self.stats_tracker = None
         self.running = False
+        self._stop_event = threading.Event()
         self.config = self.load_config(config_file)
         self.setup_logging()
         self.last_stats_time = 0
-        self.last_detection_log_time = 0
+        self.last_stats_save_time = 0
+        self.last_detection_log_time = float('-inf')  # time.monotonic() of the last logged detection
         self.detection_log_interval = 30  # Only log detections every 30 seconds
         
     def load_config(self, config_file):
@@ -42,6 +46,7 @@ class MonitoringSystemWithStats:
             "log_level": "INFO",
             "show_live_stats": False,  # Changed default to False for quieter operation
             "stats_interval": 300,  # Increased to 5 minutes for less frequent stats
+            "stats_save_interval": 60,  # Snapshot detection_stats.json every minute
             "verbose_motion": False,  # New: Control motion event logging
             "log_only_targets": True,  # New: Only log when targets are detected
             "quiet_mode": True  # New: Enable quiet operation
@@ -122,6 +127,9 @@ class MonitoringSystemWithStats:
             print("Failed to initialize AI models")  # Always show critical errors
             return False
         
+        # YOLO and dog classification run on their own worker threads
+        self.detection_pipeline = DetectionPipeline(self.ai_detector, self.on_detection_results)
+        
         # Show initial statistics only if not in quiet mode
         if not self.config.get('quiet_mode', True):
             self.stats_tracker.print_summary()
@@ -139,9 +147,16 @@ class MonitoringSystemWithStats:
             if self.config.get('verbose_motion', False):
                 self.logger.info("Processing motion detection...")
             
-            # Run AI detection
-            detections = self.ai_detector.detect_objects(image)
-            
+            # Hand the image to the AI detection pipeline
+            self.detection_pipeline.submit(image)
+                
+        except Exception as e:
+            # Always show errors
+            print(f"Error processing motion detection: {e}")
+    
+    def on_detection_results(self, image, detections):
+        """Callback function called by the detection pipeline for each image"""
+        try:
             # Record detection results (silent)
             if detections['detections']:
                 self.stats_tracker.record_detection(detections)
@@ -161,7 +176,7 @@ class MonitoringSystemWithStats:
                 
         except Exception as e:
             # Always show errors
-            print(f"Error processing motion detection: {e}")
+            print(f"Error processing detection results: {e}")
     
     def should_save_detection(self, detections):
         """Determine if detection should be saved based on config"""
@@ -178,7 +193,7 @@ class MonitoringSystemWithStats:
     def log_detection_results(self, detections):
         """Log detection results with reduced frequency"""
         timestamp = detections['timestamp']
-        current_time = time.time()
+        current_time = time.monotonic()
         
         # In quiet mode, only log targets and respect interval
         if self.config.get('quiet_mode', True):
@@ -226,12 +241,14 @@ class MonitoringSystemWithStats:
                     species_info = f" - Species: {detection['species']}" if 'species' in detection else ""
                     print(f"  - {class_name}: {confidence:.2f}{species_info}")
     
-    def print_periodic_stats(self):
-        """Print statistics periodically"""
-        if time.time() - self.last_stats_time < self.config['stats_interval']:
+    def print_periodic_stats(self, now=None):
+        """Print statistics periodically (now: time.monotonic() reading)"""
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_stats_time < self.config['stats_interval']:
             return
         
-        self.last_stats_time = time.time()
+        self.last_stats_time = now
         
         # Only show periodic stats if enabled
         if self.config.get('stats_interval', 0) > 0:
@@ -240,6 +257,26 @@ class MonitoringSystemWithStats:
             print("="*50)
             self.stats_tracker.print_summary()
     
+    def save_periodic_stats(self, now=None):
+        """
+        Snapshot the statistics periodically - events in between only
+        append to the stats log, rather than rewriting the whole file
+        """
+        if now is None:
+            now = time.monotonic()
+        if now - self.last_stats_save_time < self.config.get('stats_save_interval', 60):
+            return
+        
+        self.last_stats_save_time = now
+        self.stats_tracker.save_stats()
+    
+    def seconds_until_periodic(self, now):
+        """Time until the next periodic stats save or print is due"""
+        due = [self.last_stats_save_time + self.config.get('stats_save_interval', 60)]
+        if self.config.get('stats_interval', 0) > 0:
+            due.append(self.last_stats_time + self.config['stats_interval'])
+        return max(min(due) - now, 1)
+    
     def start(self):
         """Start the monitoring system"""
         if not self.initialize():
@@ -248,13 +285,18 @@ class MonitoringSystemWithStats:
         
         print("Starting motion monitoring...")
         
+        # Start AI detection workers before motion events can arrive
+        self.detection_pipeline.start()
+        
         # Start motion detection
         if not self.motion_detector.start_monitoring():
             print("Failed to start motion monitoring")
             return False
         
         self.running = True
-        self.last_stats_time = time.time()
+        # Intervals use the monotonic clock - the Pi has no RTC, so the
+        # wall clock can jump when NTP syncs after boot
+        self.last_stats_time = self.last_stats_save_time = time.monotonic()
         
         # Show startup message based on mode
         if self.config.get('quiet_mode', True):
@@ -275,12 +317,18 @@ class MonitoringSystemWithStats:
         """Stop the monitoring system"""
         print("Stopping monitoring system...")
         self.running = False
+        self._stop_event.set()
         
         if self.motion_detector:
             self.motion_detector.stop_monitoring()
         
+        # Let queued images finish detection
+        if self.detection_pipeline:
+            self.detection_pipeline.stop()
+        
         # Final statistics summary
         if self.stats_tracker:
+            self.stats_tracker.save_stats()
             print("\n" + "="*50)
             print("📊 FINAL SESSION SUMMARY")
             print("="*50)
@@ -305,11 +353,17 @@ class MonitoringSystemWithStats:
         
         try:
             while self.running:
-                time.sleep(1)
+                # Sleep until a periodic task is due (or stop() is called)
+                # rather than waking every second to check
+                if self._stop_event.wait(self.seconds_until_periodic(time.monotonic())):
+                    break
+                now = time.monotonic()
+                
+                self.save_periodic_stats(now)
                 
                 # Show periodic stats
                 if self.config.get('stats_interval', 0) > 0:
-                    self.print_periodic_stats()
+                    self.print_periodic_stats(now)
                     
         except KeyboardInterrupt:
             print("\nReceived interrupt signal")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Dog Classifier INT8 Quantization
+Converts the Keras dog classifier to a full-integer TensorFlow Lite model
+(run on a desktop/laptop with full TensorFlow, then copy the .tflite to the Pi)
+"""
+
+import os
+import sys
+import glob
+import random
+import numpy as np
+import cv2
+
+MODELS_DIR = "models"
+KERAS_MODEL = os.path.join(MODELS_DIR, "dog_classifier_full.h5")
+INT8_MODEL = os.path.join(MODELS_DIR, "dog_classifier_int8.tflite")
+IMAGE_SIZE = (224, 224)
+NUM_CALIBRATION_IMAGES = 100
+
+def find_calibration_images(image_dir):
+    """Find up to NUM_CALIBRATION_IMAGES dog crops for calibration"""
+    image_files = []
+    for extension in ('*.jpg', '*.jpeg', '*.png'):
+        image_files.extend(glob.glob(os.path.join(image_dir, '**', extension), recursive=True))
+
+    random.shuffle(image_files)
+    return image_files[:NUM_CALIBRATION_IMAGES]
+
+def representative_dataset(image_files):
+    """Yield calibration inputs preprocessed the same way as preprocess_dog_image"""
+    def generator():
+        for image_file in image_files:
+            image = cv2.imread(image_file)
+            if image is None:
+                continue
+
+            resized = cv2.resize(image, IMAGE_SIZE)
+            rgb_image = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+            normalized = rgb_image.astype(np.float32) / 255.0
+            yield [np.expand_dims(normalized, axis=0)]
+
+    return generator
+
+def quantize_dog_classifier(image_dir):
+    """Convert the Keras dog classifier to an INT8 TFLite model"""
+    print("🔧 DOG CLASSIFIER INT8 QUANTIZATION")
+    print("="*50)
+
+    try:
+        import tensorflow as tf
+    except ImportError as e:
+        print(f"❌ TensorFlow import failed: {e}")
+        print("Quantization needs full TensorFlow: pip3 install tensorflow")
+        return False
+
+    if not os.path.exists(KERAS_MODEL):
+        print(f"❌ Keras model not found: {KERAS_MODEL}")
+        return False
+
+    image_files = find_calibration_images(image_dir)
+    if not image_files:
+        print(f"❌ No calibration images found in {image_dir}")
+        print("   Expected cropped dog photos, e.g. felix/*.jpg and leia/*.jpg")
+        return False
+
+    print(f"📷 Calibrating with {len(image_files)} images from {image_dir}")
+
+    try:
+        model = tf.keras.models.load_model(KERAS_MODEL)
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(image_files)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        # uint8 input lets preprocess_dog_image skip the /255.0 float pass
+        converter.inference_input_type = tf.uint8
+
+        tflite_model = converter.convert()
+
+        with open(INT8_MODEL, 'wb') as f:
+            f.write(tflite_model)
+
+        print(f"✅ Saved INT8 model: {INT8_MODEL} ({len(tflite_model) / 1024 / 1024:.1f} MB)")
+        return True
+
+    except Exception as e:
+        print(f"❌ Quantization failed: {e}")
+        return False
+
+def main():
+    image_dir = sys.argv[1] if len(sys.argv) > 1 else "training_images"
+
+    if not os.path.isdir(image_dir):
+        print(f"❌ Image directory not found: {image_dir}")
+        print("Usage: python3 quantize_dog_classifier.py <dog_image_dir>")
+        return
+
+    quantize_dog_classifier(image_dir)
+
+if __name__ == "__main__":
+    main()
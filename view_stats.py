@@ -3,11 +3,25 @@
 Statistics Viewer - View detection statistics without running the monitoring system
 """
 
+import os
 import sys
 import json
 from datetime import datetime
 from detection_stats import DetectionStats, analyze_existing_detections
 
+STATS_FILE = 'detection_stats.json'
+WAL_FILE = 'detection_stats.wal'
+
+def stats_signature():
+    """Modification times of the stats files - change whenever they are saved"""
+    signature = []
+    for stats_path in (STATS_FILE, WAL_FILE):
+        try:
+            signature.append(os.stat(stats_path).st_mtime_ns)
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
 def show_menu():
     """Show the statistics menu"""
     print("\n" + "="*50)
@@ -30,19 +44,14 @@ def show_recent_activity(stats):
     print("-" * 40)
     
     hourly = stats.get_hourly_breakdown(24)
-    total_by_hour = {}
-    
-    for hour, counts in hourly.items():
-        total = sum(counts.values())
-        total_by_hour[hour] = total
     
-    # Show hours with activity
-    active_hours = [(hour, counts) for hour, counts in hourly.items() if sum(counts.values()) > 0]
+    # Show hours with activity (the breakdown is already newest first)
+    active_hours = [(hour, counts, total) for hour, counts in hourly.items()
+                    if (total := sum(counts.values())) > 0]
     
     if active_hours:
         print("Active periods:")
-        for hour, counts in sorted(active_hours, key=lambda x: x[0], reverse=True)[:12]:
-            total = sum(counts.values())
+        for hour, counts, total in active_hours[:12]:
             print(f"  {hour}: {counts['person']}👤 {counts['dog']}🐕 {counts['bird']}🐦 (Total: {total})")
     else:
         print("No activity in the last 24 hours")
@@ -52,14 +61,14 @@ def show_bird_species_report(stats):
     print("\n🐦 BIRD SPECIES REPORT")
     print("-" * 40)
     
-    bird_species = dict(stats.stats['bird_species'])
+    bird_species = stats.stats['bird_species']
     
     if bird_species:
         total_birds = sum(bird_species.values())
         print(f"Total bird detections: {total_birds}")
         print("Species breakdown:")
         
-        for species, count in sorted(bird_species.items(), key=lambda x: x[1], reverse=True):
+        for species, count in bird_species.most_common():
             percentage = (count / total_birds) * 100
             print(f"  • {species}: {count} ({percentage:.1f}%)")
     else:
@@ -102,8 +111,8 @@ def show_hourly_breakdown(stats):
     print("Hour    | Person | Dog | Bird | Total")
     print("--------|--------|-----|------|------")
     
-    for hour in sorted(hourly.keys(), reverse=True):
-        counts = hourly[hour]
+    # Already newest first
+    for hour, counts in hourly.items():
         total = sum(counts.values())
         print(f"{hour} |   {counts['person']:4d} | {counts['dog']:3d} |  {counts['bird']:3d} | {total:4d}")
 
@@ -120,7 +129,7 @@ def show_raw_data(stats):
     
     if stats.stats['detection_log']:
         print("\nLast 5 detections:")
-        for detection in stats.stats['detection_log'][-5:]:
+        for detection in stats.recent_tail(5):
             timestamp = detection['timestamp'][:19]  # Remove microseconds
             obj_type = detection['type']
             confidence = detection['confidence']
@@ -137,17 +146,30 @@ def reset_statistics():
     
     if confirm == 'yes':
         try:
-            import os
-            if os.path.exists('detection_stats.json'):
-                os.remove('detection_stats.json')
+            DetectionStats(STATS_FILE).reset_stats()
             print("✅ Statistics reset successfully!")
         except Exception as e:
             print(f"❌ Error resetting statistics: {e}")
     else:
         print("Reset cancelled.")
 
+# Menu choices that only display the loaded statistics
+STATS_VIEWS = {
+    '1': DetectionStats.print_summary,   # Current session summary
+    '3': show_recent_activity,
+    '4': show_bird_species_report,
+    '5': show_confidence_stats,
+    '6': show_hourly_breakdown,
+    '7': show_raw_data,
+}
+
 def main():
     """Main function"""
+    # Loaded once and reused across menu choices - reloaded only when the
+    # stats files have changed (monitor saved, analysis or reset ran)
+    signature = stats_signature()
+    stats = DetectionStats(STATS_FILE)
+    
     while True:
         show_menu()
         
@@ -158,41 +180,21 @@ def main():
                 print("Goodbye! 👋")
                 break
             
-            elif choice == '1':
-                # Current session summary
-                stats = DetectionStats()
-                stats.print_summary()
+            current_signature = stats_signature()
+            if current_signature != signature:
+                signature = current_signature
+                stats = DetectionStats(STATS_FILE)
+            
+            view = STATS_VIEWS.get(choice)
+            if view is not None:
+                view(stats)
             
             elif choice == '2':
                 # Analyze all detection files
                 stats = analyze_existing_detections()
+                signature = stats_signature()
                 stats.print_summary()
             
-            elif choice == '3':
-                # Recent activity
-                stats = DetectionStats()
-                show_recent_activity(stats)
-            
-            elif choice == '4':
-                # Bird species report
-                stats = DetectionStats()
-                show_bird_species_report(stats)
-            
-            elif choice == '5':
-                # Confidence statistics
-                stats = DetectionStats()
-                show_confidence_stats(stats)
-            
-            elif choice == '6':
-                # Hourly breakdown
-                stats = DetectionStats()
-                show_hourly_breakdown(stats)
-            
-            elif choice == '7':
-                # Raw data
-                stats = DetectionStats()
-                show_raw_data(stats)
-            
             elif choice == '8':
                 # Reset statistics
                 reset_statistics()